@@ -0,0 +1,285 @@
+"""Scheduler benchmarks on synthetic course tables.
+
+For every scale (number of sections) a course table and faculty list shaped
+like ``combined2.xlsx`` / ``faculty.csv`` are generated into a scratch copy of
+the scheduler, and a worker process there times each stage separately:
+
+* ``generate_all_schedules`` (load, solve, render and write everything),
+* ``find_best_slot`` probes against the solved faculty and room schedules,
+* HTML rendering of every section page,
+* ``convert_html_to_excel`` over the generated pages, and the model-based
+  streaming export for comparison.
+
+Each scale runs in its own process so the peak memory (max RSS) reported for
+it is not inflated by earlier scales. Results are written as JSON, e.g.
+
+    python benchmark.py --scales 10 100 1000 10000 --output bench.json
+    python benchmark.py --baseline bench.json
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+DEFAULT_SCALES = [10, 100, 1000]
+RESULT_VERSION = 1
+
+# Terms of one synthetic department: four semesters with two sections each
+SYNTHETIC_TERMS = [f"{sem}{section}" for sem in (2, 4, 6, 8) for section in 'AB']
+COURSES_PER_SECTION = 7
+LAB_COURSES_PER_SECTION = 2
+COURSES_PER_FACULTY = 3
+SECTIONS_PER_LAB = 2
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_PATTERNS = ['*.py', '*.html', '*.css']
+
+
+def synthetic_tables(num_sections, seed=0):
+    """Course rows and faculty rows for ``num_sections`` synthetic sections.
+
+    Departments get eight terms each (2A ... 8B) and every section has its own
+    classroom. Faculty and lab rooms are shared across departments so the
+    run-wide availability checks are exercised as with the real sheet.
+    """
+    rng = random.Random(seed)
+    num_faculty = max(2, num_sections * COURSES_PER_SECTION // COURSES_PER_FACULTY)
+    num_labs = max(1, num_sections // SECTIONS_PER_LAB)
+    faculty = [f"Dr. Faculty {idx:05d}" for idx in range(num_faculty)]
+
+    course_rows, faculty_rows = [], []
+    for section_idx in range(num_sections):
+        dept = f"D{section_idx // len(SYNTHETIC_TERMS):04d}"
+        term = SYNTHETIC_TERMS[section_idx % len(SYNTHETIC_TERMS)]
+        classroom = f"C{section_idx:05d}"
+        for course_idx in range(COURSES_PER_SECTION):
+            has_lab = course_idx < LAB_COURSES_PER_SECTION
+            code = f"{dept}-{term}-{course_idx:02d}"
+            instructor = rng.choice(faculty)
+            l_hours, t_hours = rng.choice([(3, 1), (3, 0), (2, 1)])
+            p_hours = 2 if has_lab else 0
+            course_rows.append({
+                'Department': dept,
+                'Semester': term,
+                'Course Code': code,
+                'Course Name': f"Synthetic Course {code}",
+                'L': l_hours,
+                'T': t_hours,
+                'P': p_hours,
+                'S': 0,
+                'C': l_hours + t_hours + p_hours // 2,
+                'Faculty': instructor,
+                'Classroom': classroom,
+                'Elective Basket': None,
+                'Unnamed: 12': None,
+                'Lab_room': f"L{rng.randrange(num_labs):04d}" if has_lab else None,
+            })
+            faculty_rows.append({
+                'Faculty Name': instructor,
+                'Course Code': code,
+                'Course Name': f"Synthetic Course {code}",
+                'Semester': term[:-1],
+                'Branch': dept,
+            })
+    return course_rows, faculty_rows
+
+
+def write_synthetic_inputs(workdir, num_sections, seed=0):
+    """Write combined2.xlsx and faculty.csv for a synthetic workload into ``workdir``"""
+    import pandas as pd
+    from data_loader import COURSE_FILE, COURSE_SHEET, FACULTY_FILE
+    course_rows, faculty_rows = synthetic_tables(num_sections, seed)
+    pd.DataFrame(course_rows).to_excel(os.path.join(workdir, COURSE_FILE), sheet_name=COURSE_SHEET, index=False)
+    pd.DataFrame(faculty_rows).to_csv(os.path.join(workdir, FACULTY_FILE), index=False)
+    return len(course_rows)
+
+
+def peak_rss_kb():
+    """High-water mark of this process's resident memory in KiB, or None where unsupported"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def timed(results, phase, func, *args, **kwargs):
+    """Run ``func`` and record its wall time and the peak RSS so far under ``phase``"""
+    start = time.perf_counter()
+    value = func(*args, **kwargs)
+    results[phase] = {'seconds': round(time.perf_counter() - start, 6), 'peak_rss_kb': peak_rss_kb()}
+    return value
+
+
+def probe_find_best_slot(main, model, max_sections=200):
+    """Call find_best_slot for every lecture of up to ``max_sections`` sections on every day"""
+    calls = 0
+    for section_model in model[:max_sections]:
+        schedule = main.new_section_schedule(section_model['dept'], section_model['sem'], section_model['section'])
+        for session, _, _ in section_model['placements']:
+            if session['type'] != 'LEC':
+                continue
+            for day_idx in range(len(main.WEEKDAYS)):
+                main.find_best_slot(schedule, session['faculty_id'], session['venue'], main.LECTURE_BLOCKS,
+                                    day_idx, session['code'], 'LEC')
+                calls += 1
+    return calls
+
+
+def convert_pages(export_to_excel, html_dir, excel_path):
+    """Legacy HTML -> Excel conversion of every generated page into one workbook"""
+    from openpyxl import Workbook
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    pages = sorted(f for f in os.listdir(html_dir) if f.startswith('timetable_') and f.endswith('.html'))
+    for page_idx, page in enumerate(pages):
+        export_to_excel.convert_html_to_excel(os.path.join(html_dir, page), workbook, 'sheet', page_idx)
+    workbook.save(excel_path)
+    return len(pages)
+
+
+def run_worker(engine, seed, jobs, result_path):
+    """Time every stage inside a prepared scratch copy (the current directory)"""
+    import main
+    import render
+    import export_to_excel
+
+    phases = {}
+    model = timed(phases, 'generate_all_schedules', main.generate_all_schedules,
+                  engine=engine, seed=seed, jobs=jobs)
+
+    calls = timed(phases, 'find_best_slot', probe_find_best_slot, main, model)
+    phases['find_best_slot']['calls'] = calls
+    phases['find_best_slot']['microseconds_per_call'] = round(phases['find_best_slot']['seconds'] * 1e6 / max(calls, 1), 3)
+
+    generated = datetime.now().strftime("%d-%m-%Y %I:%M %p")
+    timed(phases, 'render_html', lambda: [render.render_section(section_model, generated) for section_model in model])
+
+    html_dir = os.path.join('output', 'html')
+    excel_dir = os.path.join('output', 'excel')
+    os.makedirs(excel_dir, exist_ok=True)
+    pages = timed(phases, 'convert_html_to_excel', convert_pages, export_to_excel, html_dir,
+                  os.path.join(excel_dir, 'converted.xlsx'))
+    phases['convert_html_to_excel']['pages'] = pages
+    timed(phases, 'export_model_to_excel', export_to_excel.export_model_to_excel, model,
+          os.path.join(excel_dir, 'all_timetables.xlsx'))
+
+    result = {
+        'sections': len(model),
+        'sessions': sum(len(section_model['placements']) + len(section_model['conflicts']) for section_model in model),
+        'unplaced': sum(len(section_model['conflicts']) for section_model in model),
+        'phases': phases,
+        'peak_rss_kb': peak_rss_kb(),
+    }
+    with open(result_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f)
+
+
+def prepare_workdir(workdir, num_sections, seed):
+    """Copy the scheduler sources into ``workdir`` and write a synthetic workload next to them"""
+    for pattern in SOURCE_PATTERNS:
+        for path in glob.glob(os.path.join(BENCHMARK_DIR, pattern)):
+            shutil.copy(path, workdir)
+    return write_synthetic_inputs(workdir, num_sections, seed)
+
+
+def run_scale(num_sections, engine, seed, jobs, keep=False):
+    """Benchmark one scale in a scratch directory and a fresh process"""
+    workdir = tempfile.mkdtemp(prefix=f'timetable_bench_{num_sections}_')
+    try:
+        rows = prepare_workdir(workdir, num_sections, seed)
+        result_path = os.path.join(workdir, 'result.json')
+        command = [sys.executable, 'benchmark.py', '--worker', '--engine', engine, '--seed', str(seed),
+                   '--jobs', str(jobs), '--result', result_path]
+        start = time.perf_counter()
+        subprocess.run(command, cwd=workdir, stdout=subprocess.DEVNULL, check=True)
+        with open(result_path, 'r', encoding='utf-8') as f:
+            result = json.load(f)
+        result['rows'] = rows
+        result['total_seconds'] = round(time.perf_counter() - start, 6)
+        return result
+    finally:
+        if keep:
+            print(f"Kept scratch directory {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def source_revision():
+    """Git revision of the benchmarked tree, if it is a checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCHMARK_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(report, baseline=None):
+    """Human-readable summary; with a baseline report, also the time ratio per phase"""
+    previous = {}
+    if baseline:
+        previous = {run['scale']: run for run in baseline['runs']}
+    for run in report['runs']:
+        print(f"\n{run['scale']} sections ({run['rows']} course rows, {run['unplaced']} unplaced sessions), "
+              f"peak RSS {run['peak_rss_kb']} KiB")
+        for phase, stats in run['phases'].items():
+            line = f"  {phase:<24}{stats['seconds']:>12.3f}s"
+            before = previous.get(run['scale'], {}).get('phases', {}).get(phase)
+            if before and before['seconds']:
+                line += f"  ({stats['seconds'] / before['seconds']:.2f}x baseline)"
+            print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scheduler on synthetic workloads")
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES,
+                        help="numbers of sections to benchmark (default: 10 100 1000)")
+    parser.add_argument('--engine', default='random', help="scheduling engine passed to generate_all_schedules")
+    parser.add_argument('--seed', type=int, default=0, help="seed for the synthetic tables and the scheduler")
+    parser.add_argument('--jobs', type=int, default=1, help="scheduler processes")
+    parser.add_argument('--output', default='benchmark_results.json', help="where to write the JSON results")
+    parser.add_argument('--baseline', help="earlier results file to compare against")
+    parser.add_argument('--keep', action='store_true', help="keep the scratch directories for inspection")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--result', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.engine, args.seed, args.jobs, args.result)
+        sys.exit(0)
+
+    report = {
+        'version': RESULT_VERSION,
+        'revision': source_revision(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'engine': args.engine,
+        'seed': args.seed,
+        'jobs': args.jobs,
+        'runs': [],
+    }
+    for scale in args.scales:
+        print(f"Benchmarking {scale} sections...")
+        result = run_scale(scale, args.engine, args.seed, args.jobs, keep=args.keep)
+        result['scale'] = scale
+        report['runs'].append(result)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_table(report, baseline)
+    print(f"\nResults have been saved to {args.output}")
@@ -0,0 +1,47 @@
+"""Pre-solve capacity analysis of a planned timetable.
+
+Before any search runs, the periods every session needs are totalled per
+resource (faculty member, room, section) and compared with the periods that
+resource can offer in a week. A section offers every period outside its
+breaks; a faculty member or room offers every period in which at least one of
+the sections it serves is not on a break. A resource that needs more periods
+than it offers, or a session longer than every free run of its section's day,
+can never be scheduled, whatever the engine or seed.
+
+The totals are necessary conditions only: a timetable that passes can still
+fail to place sessions, but one that fails cannot be completed.
+"""
+from occupancy import free_starts
+
+
+def analyze_capacity(demands, num_days, num_periods):
+    """Overloaded resources and impossible sessions of a list of session demands.
+
+    Each demand is a dict with ``blocks``, the ``rest_mask`` of its section,
+    ``resources`` (``(kind, name)`` keys it occupies) and a ``label`` used in
+    reports. Returns ``(overloaded, impossible, load)``: ``overloaded`` lists
+    ``(kind, name, required, capacity)`` worst first, ``impossible`` the labels
+    of sessions that fit no day, and ``load`` maps every resource to its
+    ``(required, capacity)``.
+    """
+    all_periods = (1 << num_periods) - 1
+    required = {}
+    # Periods in which every section using a resource is on a break
+    common_rest = {}
+    impossible = []
+    for demand in demands:
+        if not free_starts(demand['rest_mask'], demand['blocks'], num_periods):
+            impossible.append(demand['label'])
+        for key in demand['resources']:
+            required[key] = required.get(key, 0) + demand['blocks']
+            common_rest[key] = common_rest.get(key, all_periods) & demand['rest_mask']
+
+    load = {}
+    overloaded = []
+    for key, periods in required.items():
+        capacity = num_days * bin(all_periods & ~common_rest[key]).count('1')
+        load[key] = (periods, capacity)
+        if periods > capacity:
+            overloaded.append((key[0], key[1], periods, capacity))
+    overloaded.sort(key=lambda entry: entry[3] - entry[2])
+    return overloaded, impossible, load
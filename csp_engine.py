@@ -0,0 +1,216 @@
+"""Constraint-propagation scheduling engine.
+
+Sessions are variables whose domains are per-day bitmasks of feasible start
+periods. Domains are pruned against resource occupancy (faculty, rooms, the
+section grid), breaks and the same-course spacing rules after every
+assignment. Variables are chosen most-constrained-first and the search
+backtracks until every session is placed or the node budget runs out, in
+which case the deepest partial timetable is completed greedily and the
+sessions that cannot be placed are reported with the constraint that blocked
+them.
+"""
+from occupancy import block_mask, free_starts, overlapping_starts, iter_bits
+
+DEFAULT_NODE_LIMIT = 20000
+MIN_GAP = 6
+
+
+class SearchBudgetExceeded(Exception):
+    """Raised when the backtracking search reaches its node limit"""
+
+
+def spread_mask(mask, distance, num_periods):
+    """Bits within ``distance`` periods of any set bit, excluding the bits themselves"""
+    spread = 0
+    for offset in range(1, distance + 1):
+        spread |= (mask << offset) | (mask >> offset)
+    return spread & ~mask & ((1 << num_periods) - 1)
+
+
+def solve_sessions(variables, resource_masks, num_days, num_periods, rest_mask, near_break_mask,
+                   rng, course_starts=None, course_elsewhere=None, min_gap=MIN_GAP, node_limit=DEFAULT_NODE_LIMIT):
+    """Assign a (day, start period) to every session variable.
+
+    ``variables`` is a list of dicts with ``kind`` ('LAB', 'LEC' or 'TUT'),
+    ``code``, ``blocks`` and ``resources`` (keys into ``resource_masks`` that
+    the session occupies). ``resource_masks`` maps each key to its per-day
+    occupancy masks and is not modified; ``course_starts`` maps course codes
+    to per-day masks of existing session starts and ``course_elsewhere`` to
+    per-day masks of the periods other sections already hold the course in,
+    which a session of that course may not use.
+
+    Returns ``(placements, conflicts)`` where ``placements[i]`` is the
+    ``(day_idx, start_period)`` of variable ``i`` or ``None``, and
+    ``conflicts`` lists ``(i, reason)`` for every unplaced variable.
+    """
+    masks = {key: list(day_masks) for key, day_masks in resource_masks.items()}
+    starts = {code: list(day_masks) for code, day_masks in (course_starts or {}).items()}
+    for variable in variables:
+        for key in variable['resources']:
+            masks.setdefault(key, [0] * num_days)
+        starts.setdefault(variable['code'], [0] * num_days)
+
+    elsewhere_masks = course_elsewhere or {}
+
+    def domain(variable):
+        """Per-day start masks still open to a variable"""
+        code_starts = starts[variable['code']]
+        elsewhere = elsewhere_masks.get(variable['code'], [0] * num_days)
+        shared_periods = 0
+        if variable['kind'] == 'LEC':
+            # Same lecture may not reuse a period it already holds on another day
+            for day_mask in code_starts:
+                shared_periods |= day_mask
+        days = []
+        for day_idx in range(num_days):
+            busy = rest_mask | shared_periods | elsewhere[day_idx]
+            for key in variable['resources']:
+                busy |= masks[key][day_idx]
+            open_starts = free_starts(busy, variable['blocks'], num_periods)
+            days.append(open_starts & ~spread_mask(code_starts[day_idx], min_gap, num_periods))
+        return days
+
+    def assign(index, day_idx, start_period, trail):
+        variable = variables[index]
+        block = block_mask(start_period, variable['blocks'])
+        for key in variable['resources']:
+            trail.append((masks[key], day_idx, masks[key][day_idx]))
+            masks[key][day_idx] |= block
+        code_starts = starts[variable['code']]
+        trail.append((code_starts, day_idx, code_starts[day_idx]))
+        code_starts[day_idx] |= 1 << start_period
+
+    def undo(trail):
+        while trail:
+            day_masks, day_idx, previous = trail.pop()
+            day_masks[day_idx] = previous
+
+    def ordered_values(variable, days):
+        preferred, others = [], []
+        near_starts = overlapping_starts(near_break_mask, variable['blocks'])
+        for day_idx, day_starts in enumerate(days):
+            for start_period in iter_bits(day_starts):
+                if variable['kind'] == 'LEC' and near_starts >> start_period & 1:
+                    preferred.append((day_idx, start_period))
+                else:
+                    others.append((day_idx, start_period))
+        rng.shuffle(preferred)
+        rng.shuffle(others)
+        return preferred + others
+
+    placements = [None] * len(variables)
+    conflicts = []
+
+    # Sessions with an empty domain up front can never be placed; report them immediately
+    pending = []
+    for index, variable in enumerate(variables):
+        if any(domain(variable)):
+            pending.append(index)
+        else:
+            conflicts.append((index, diagnose(variable, masks, starts, num_days, num_periods, rest_mask, min_gap,
+                                             elsewhere_masks.get(variable['code']))))
+
+    assigned = {}
+    best = {}
+    nodes = 0
+
+    def search(remaining):
+        nonlocal nodes, best
+        if len(assigned) > len(best):
+            best = dict(assigned)
+        if not remaining:
+            return True
+
+        # Most-constrained variable first; forward check every remaining domain
+        chosen, chosen_days, chosen_size = None, None, None
+        for index in remaining:
+            days = domain(variables[index])
+            size = sum(bin(day_starts).count('1') for day_starts in days)
+            if size == 0:
+                return False
+            if chosen_size is None or size < chosen_size:
+                chosen, chosen_days, chosen_size = index, days, size
+
+        rest = [index for index in remaining if index != chosen]
+        for day_idx, start_period in ordered_values(variables[chosen], chosen_days):
+            nodes += 1
+            if nodes > node_limit:
+                raise SearchBudgetExceeded()
+            trail = []
+            assign(chosen, day_idx, start_period, trail)
+            assigned[chosen] = (day_idx, start_period)
+            if search(rest):
+                return True
+            del assigned[chosen]
+            undo(trail)
+        return False
+
+    base_masks = {key: list(day_masks) for key, day_masks in masks.items()}
+    base_starts = {code: list(day_masks) for code, day_masks in starts.items()}
+    try:
+        solved = search(pending)
+    except SearchBudgetExceeded:
+        solved = False
+
+    if solved:
+        final = assigned
+    else:
+        # Restart from the deepest partial assignment and place what still fits greedily
+        masks.clear()
+        masks.update({key: list(day_masks) for key, day_masks in base_masks.items()})
+        starts.clear()
+        starts.update({code: list(day_masks) for code, day_masks in base_starts.items()})
+        final = dict(best)
+        for index, (day_idx, start_period) in final.items():
+            assign(index, day_idx, start_period, [])
+        remaining = [index for index in pending if index not in final]
+        while remaining:
+            sized = []
+            for index in remaining:
+                days = domain(variables[index])
+                sized.append((sum(bin(day_starts).count('1') for day_starts in days), index, days))
+            size, index, days = min(sized)
+            remaining.remove(index)
+            if size == 0:
+                conflicts.append((index, diagnose(variables[index], masks, starts, num_days, num_periods, rest_mask,
+                                                  min_gap, elsewhere_masks.get(variables[index]['code']))))
+                continue
+            day_idx, start_period = ordered_values(variables[index], days)[0]
+            assign(index, day_idx, start_period, [])
+            final[index] = (day_idx, start_period)
+
+    for index, placement in final.items():
+        placements[index] = placement
+    conflicts.sort()
+    return placements, conflicts
+
+
+def diagnose(variable, masks, starts, num_days, num_periods, rest_mask, min_gap=MIN_GAP, elsewhere=None):
+    """Name the first constraint that leaves a session without any feasible start"""
+    busy = [rest_mask] * num_days
+    layers = [('section', None)] + [(key[0], key) for key in variable['resources'] if key[0] != 'section']
+    for label, key in layers:
+        if key is None:
+            key = next((key for key in variable['resources'] if key[0] == 'section'), None)
+        if key is not None:
+            busy = [day_busy | masks[key][day_idx] for day_idx, day_busy in enumerate(busy)]
+        if not any(free_starts(day_busy, variable['blocks'], num_periods) for day_busy in busy):
+            if label == 'section':
+                return "no free block left in the section week outside breaks"
+            return f"{label} '{key[1]}' has no free block matching the section's free periods"
+
+    if elsewhere:
+        busy = [day_busy | elsewhere[day_idx] for day_idx, day_busy in enumerate(busy)]
+        if not any(free_starts(day_busy, variable['blocks'], num_periods) for day_busy in busy):
+            return f"{variable['code']} is held by another section in every free block"
+
+    code_starts = starts.get(variable['code'], [0] * num_days)
+    shared_periods = 0
+    if variable['kind'] == 'LEC':
+        for day_mask in code_starts:
+            shared_periods |= day_mask
+    for day_idx in range(num_days):
+        open_starts = free_starts(busy[day_idx] | shared_periods, variable['blocks'], num_periods)
+        if open_starts & ~spread_mask(code_starts[day_idx], min_gap, num_periods):
+            return "search budget exhausted before a consistent placement was found"
+    return f"minimum-gap / same-period rule with other {variable['code']} sessions"
@@ -0,0 +1,200 @@
+"""Lazy, read-once access to the scheduler's input files.
+
+Nothing is read (and pandas is not imported) until a table is first
+requested; every later call returns the same parsed object.
+
+Parsed tables are normalized (cleaned faculty names, integer L/T/P/S/C hours)
+and cached as pickled columns under ``output/.cache``. A cache entry is
+reused while its source file keeps the same size and mtime, or, if those
+changed, the same SHA-256 content hash; otherwise the file is parsed again.
+"""
+import hashlib
+import os
+import pickle
+import re
+from functools import lru_cache
+
+COURSE_FILE = 'combined2.xlsx'
+COURSE_SHEET = 'Sheet1'
+FACULTY_FILE = 'faculty.csv'
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output', '.cache')
+CACHE_VERSION = 2
+
+HOUR_COLUMNS = ['L', 'T', 'P', 'S', 'C']
+
+# Venue cells that do not name a bookable room
+ROOM_PLACEHOLDERS = {'', '-', 'nan', 'none', 'online', 'tba'}
+# Notes in place of a room, e.g. 'Will be scheduled Post MidSem'
+ROOM_PLACEHOLDER_PREFIXES = ('will be scheduled',)
+# Annotations after a room name, e.g. the '(Friday)' of 'C004(Friday)'
+ROOM_ANNOTATION = re.compile(r'\([^)]*\)')
+# Joins two faculty names, e.g. 'Dr. Pramod Yelmewad and Dr. Animesh Roy'; a whole word, not part of 'Anand'
+FACULTY_AND = re.compile(r'\s+and\s+', re.IGNORECASE)
+
+
+def is_missing(value):
+    """pandas-free equivalent of pd.isna for a single cell value"""
+    if value is None:
+        return True
+    try:
+        return bool(value != value)  # NaN is the only value not equal to itself
+    except TypeError:
+        return True  # pd.NA refuses boolean conversion
+
+
+def clean_faculty_name(name):
+    """Clean and standardize faculty names"""
+    if is_missing(name):
+        return "TBA"
+    name = str(name).strip()
+    # Handle multiple faculty names (take the first one)
+    if '/' in name:
+        name = name.split('/')[0].strip()
+    if '&' in name:
+        name = name.split('&')[0].strip()
+    if '(' in name:
+        name = name.split('(')[0].strip()
+    name = FACULTY_AND.split(name)[0].strip()
+    return name
+
+
+@lru_cache(maxsize=None)
+def room_names(venue):
+    """Individual rooms named by a venue cell such as 'C202/C004(Friday)'; placeholders like '-' or 'online' are dropped"""
+    if is_missing(venue):
+        return ()
+    rooms = []
+    for part in re.split(r'[/,&]', ROOM_ANNOTATION.sub('', str(venue))):
+        room = part.strip()
+        if room.lower() in ROOM_PLACEHOLDERS or room.lower().startswith(ROOM_PLACEHOLDER_PREFIXES):
+            continue
+        if room not in rooms:
+            rooms.append(room)
+    return tuple(rooms)
+
+
+def file_signature(path):
+    """Cheap change check for a source file: (size, mtime in ns)"""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def file_hash(path):
+    """SHA-256 of a source file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path(path):
+    return os.path.join(CACHE_DIR, os.path.basename(path) + '.pkl')
+
+
+def read_cached_columns(path):
+    """Cached columns for ``path`` if the source is unchanged, else None"""
+    try:
+        with open(cache_path(path), 'rb') as f:
+            entry = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if entry.get('version') != CACHE_VERSION:
+        return None
+
+    signature = file_signature(path)
+    if entry['signature'] == signature:
+        return entry['columns']
+    # Touched but maybe not edited: fall back to the content hash and refresh the signature
+    if entry['sha256'] == file_hash(path):
+        entry['signature'] = signature
+        write_pickle_atomic(cache_path(path), entry)
+        return entry['columns']
+    return None
+
+
+def write_atomic(target, data, optional=False):
+    """Write ``data`` (bytes or text) to ``target`` via a temporary file so readers never see a partial file.
+
+    With ``optional`` a file that cannot be written is skipped and False is
+    returned; otherwise the OSError propagates.
+    """
+    temp_path = f"{target}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if isinstance(data, bytes):
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+        else:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+        os.replace(temp_path, target)
+        return True
+    except OSError:
+        if not optional:
+            raise
+        # Optional files are an optimization only; a read-only tree still works
+        return False
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def write_pickle_atomic(target, obj):
+    """Pickle ``obj`` to ``target`` via a temporary file; returns False if it could not be written"""
+    return write_atomic(target, pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL), optional=True)
+
+
+def cached_columns(path, parse):
+    """Normalized columns of an input file, parsed with ``parse`` only when the cache is stale"""
+    columns = read_cached_columns(path)
+    if columns is None:
+        columns = parse(path)
+        write_pickle_atomic(cache_path(path), {
+            'version': CACHE_VERSION,
+            'signature': file_signature(path),
+            'sha256': file_hash(path),
+            'columns': columns,
+        })
+    return columns
+
+
+def parse_course_columns(path):
+    """Read the course sheet and normalize it into plain Python columns"""
+    import pandas as pd
+    frame = pd.read_excel(path, sheet_name=COURSE_SHEET)
+    columns = {name: frame[name].tolist() for name in frame.columns}
+    for name in HOUR_COLUMNS:
+        columns[name] = [0 if is_missing(value) else int(value) for value in columns[name]]
+    columns['Faculty Clean'] = [clean_faculty_name(name) for name in columns['Faculty']]
+    return columns
+
+
+def parse_faculty_columns(path):
+    """Read the faculty list and normalize it into plain Python columns"""
+    import pandas as pd
+    frame = pd.read_csv(path)
+    columns = {name: frame[name].tolist() for name in frame.columns}
+    columns['Faculty Clean'] = [clean_faculty_name(name) for name in columns['Faculty Name']]
+    return columns
+
+
+@lru_cache(maxsize=None)
+def load_course_table(path=COURSE_FILE):
+    """Normalized course sheet (one row per course offering), read on first use"""
+    import pandas as pd
+    return pd.DataFrame(cached_columns(path, parse_course_columns))
+
+
+@lru_cache(maxsize=None)
+def load_faculty_table(path=FACULTY_FILE):
+    """Normalized faculty list, read on first use"""
+    import pandas as pd
+    return pd.DataFrame(cached_columns(path, parse_faculty_columns))
+
+
+def reset_cache():
+    """Forget every loaded table so the next call re-reads the files (or their cache)"""
+    load_course_table.cache_clear()
+    load_faculty_table.cache_clear()
@@ -1,7 +1,12 @@
 import os
-from bs4 import BeautifulSoup
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.cell_range import CellRange
 import re
 
 def get_color_from_style(style):
@@ -12,6 +17,7 @@ def get_color_from_style(style):
 
 def convert_html_to_excel(html_path, workbook, dept_name=None, term=None, section=None):
     """Convert a single HTML timetable to an Excel worksheet"""
+    from bs4 import BeautifulSoup
     with open(html_path, 'r', encoding='utf-8') as f:
         soup = BeautifulSoup(f.read(), 'html.parser')
     
@@ -118,16 +124,219 @@ def convert_html_to_excel(html_path, workbook, dept_name=None, term=None, sectio
     
     return ws
 
+# Style objects shared by every streamed cell
+HEADER_FILL = PatternFill(start_color='1A237E', end_color='1A237E', fill_type='solid')
+HEADER_FONT = Font(color='FFFFFF', bold=True)
+BOLD_FONT = Font(bold=True)
+BREAK_FILL = PatternFill(start_color='ECEFF1', end_color='ECEFF1', fill_type='solid')
+BORDER = Border(left=Side(style='thin'), right=Side(style='thin'),
+                top=Side(style='thin'), bottom=Side(style='thin'))
+CENTERED = Alignment(horizontal='center', vertical='center', wrap_text=True)
+MAX_COLUMN_WIDTH = 30
+
+@lru_cache(maxsize=None)
+def color_fill(color):
+    """Solid fill for a course color, created once per color"""
+    return PatternFill(start_color=color, end_color=color, fill_type='solid')
+
+def section_sheet_name(section_model):
+    if 'sheet_name' in section_model:
+        return section_model['sheet_name'][:31]  # Faculty and room views name their own sheets
+    sheet_name = f"{section_model['dept'].replace(' ', '_').lower()}_{section_model['sem']}"
+    if section_model['section']:
+        sheet_name += f"_{section_model['section'].lower()}"
+    return sheet_name[:31]  # Excel sheet name length limit
+
+def section_sheet_rows(ws, section_model, widths, merges):
+    """Styled rows of one section's sheet.
+
+    Column widths (longest line per column) are collected into ``widths`` and
+    merged ranges into ``merges`` while the rows are built, so the sheet can
+    be streamed without a second pass.
+    """
+    def cell(value, fill=None, font=None, alignment=None, border=True, column=None):
+        excel_cell = WriteOnlyCell(ws, value=value)
+        if fill:
+            excel_cell.fill = fill
+        if font:
+            excel_cell.font = font
+        if alignment:
+            excel_cell.alignment = alignment
+        if border:
+            excel_cell.border = BORDER
+        if value is not None and column is not None:
+            length = max(len(line) for line in str(value).split('\n'))
+            widths[column] = max(widths.get(column, 0), length)
+        return excel_cell
+
+    def row(values, **style):
+        return [cell(value, column=col, **style) for col, value in enumerate(values, 1)]
+
+    # Header row
+    headers = ['Day'] + [f"{begin}\nto\n{end}" for begin, end in section_model['periods']]
+    rows = [row(headers, fill=HEADER_FILL, font=HEADER_FONT, alignment=CENTERED)]
+
+    # One row per day; breaks and sessions are merged across their periods
+    for row_idx, day in enumerate(section_model['days'], 2):
+        cells = [cell(day['name'], font=BOLD_FONT, alignment=CENTERED, column=1)]
+        col = 2
+        for entry in day['cells']:
+            colspan = entry['colspan']
+            if entry['kind'] == 'break':
+                cells.append(cell('BREAK', fill=BREAK_FILL, alignment=CENTERED, column=col))
+            elif entry['kind'] == 'session':
+                session = entry['session']
+                value = f"{session['code']} {session['type']}\nRoom: {session['venue']}\n{session['faculty']}"
+                cells.append(cell(value, fill=color_fill(entry['color']), alignment=CENTERED, column=col))
+            else:
+                cells.append(cell(None, alignment=CENTERED))
+            if colspan > 1:
+                merges.append((row_idx, col, col + colspan - 1))
+                cells.extend([None] * (colspan - 1))
+            col += colspan
+        rows.append(cells)
+
+    # LTPSC table, then the color legend
+    rows += [[], [], [cell('LTPSC Information', font=BOLD_FONT, border=False, column=1)],
+             row(['Course Code', 'L', 'T', 'P', 'S', 'C'], font=BOLD_FONT)]
+    for course in section_model['courses']:
+        if course['hours'] is not None:
+            rows.append(row((course['code'],) + tuple(course['hours'])))
+
+    rows += [[], [cell('Course Legend', font=BOLD_FONT, border=False, column=1)],
+             row(['Course Code', 'Color', 'Course Name', 'Faculty'], font=BOLD_FONT)]
+    for course in section_model['courses']:
+        legend_row = row((course['code'], None, course['name'], course['faculty']))
+        legend_row[1].fill = color_fill(course['color'])
+        rows.append(legend_row)
+    return rows
+
+def write_section_sheet(workbook, section_model):
+    """Stream one section's solved timetable (see main.build_section_model) into a write-only workbook"""
+    ws = workbook.create_sheet(title=section_sheet_name(section_model))
+    widths, merges = {}, []
+    rows = section_sheet_rows(ws, section_model, widths, merges)
+
+    # Write-only sheets need column sizes before the first row is written
+    for col, length in widths.items():
+        ws.column_dimensions[get_column_letter(col)].width = min(length + 2, MAX_COLUMN_WIDTH)
+    for row_idx, first_col, last_col in merges:
+        ws.merged_cells.add(CellRange(min_row=row_idx, max_row=row_idx, min_col=first_col, max_col=last_col))
+    for cells in rows:
+        ws.append(cells)
+    return ws
+
+def write_workbook(models, excel_path):
+    """Stream the given sections into one workbook at ``excel_path``"""
+    wb = Workbook(write_only=True)
+    for section_model in models:
+        write_section_sheet(wb, section_model)
+    wb.save(excel_path)
+    return excel_path
+
+def export_model_to_excel(model, excel_path, by_department=False, jobs=1):
+    """Write a solved timetable model to Excel without going through HTML.
+
+    By default every section goes into ``excel_path``; with ``by_department``
+    each department gets its own ``timetables_<dept>.xlsx`` next to it, written
+    in ``jobs`` processes. Returns the paths written.
+    """
+    excel_dir = os.path.dirname(excel_path)
+    os.makedirs(excel_dir, exist_ok=True)
+
+    if not by_department:
+        write_workbook(model, excel_path)
+        print(f"\nAll timetables have been saved to {excel_path}")
+        return [excel_path]
+
+    departments = {}
+    for section_model in model:
+        departments.setdefault(section_model['dept'], []).append(section_model)
+    targets = [(models, os.path.join(excel_dir, f"timetables_{dept.replace(' ', '_').lower()}.xlsx"))
+               for dept, models in departments.items()]
+
+    if jobs > 1 and len(targets) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(targets))) as pool:
+            paths = list(pool.map(write_workbook, *zip(*targets)))
+    else:
+        paths = [write_workbook(models, path) for models, path in targets]
+    for path in paths:
+        print(f"Timetables have been saved to {path}")
+    return paths
+
+def legend_table(soup, heading):
+    """Table following the h3 heading with the given text, or None if the page has no such table"""
+    for h3 in soup.find_all('h3'):
+        if h3.get_text(strip=True) == heading:
+            return h3.find_next('table')
+    return None
+
+def read_section_html(html_path, dept, sem, section):
+    """Rebuild a section model from a generated timetable page, for output directories without a solved model"""
+    from bs4 import BeautifulSoup
+    with open(html_path, 'r', encoding='utf-8') as f:
+        soup = BeautifulSoup(f.read(), 'html.parser')
+
+    rows = soup.find('table').find_all('tr')
+    periods = []
+    for header in rows[0].find_all('th')[1:]:
+        begin, _, end = [part.strip() for part in header.get_text('\n').split('\n')]
+        periods.append((begin, end))
+
+    days = []
+    for tr in rows[1:]:
+        cells = tr.find_all('td')
+        entries = []
+        for td in cells[1:]:
+            colspan = int(td.get('colspan', 1))
+            block = td.find('div', class_='course-block')
+            if 'break' in td.get('class', []):
+                entries.append({'kind': 'break', 'colspan': colspan})
+            elif block:
+                lines = [line.strip() for line in block.get_text('\n').split('\n') if line.strip()]
+                code_id, _, session_type = lines[0].rpartition(' ')
+                venue = lines[1].replace('Room:', '', 1).strip() if len(lines) > 1 else ''
+                faculty = lines[2] if len(lines) > 2 else ''
+                session = {'type': session_type, 'code': code_id, 'venue': venue, 'faculty': faculty,
+                           'blocks': colspan}
+                entries.append({'kind': 'session', 'colspan': colspan, 'session': session,
+                                'color': get_color_from_style(block.get('style')) or 'ffffff'})
+            else:
+                entries.append({'kind': 'empty', 'colspan': colspan})
+        days.append({'name': cells[0].text.strip(), 'cells': entries})
+
+    # Pages of sections without LTPSC data only have the course legend
+    hours = {}
+    ltpsc_table = legend_table(soup, 'LTPSC Information')
+    if ltpsc_table is not None:
+        for tr in ltpsc_table.find_all('tr')[1:]:
+            values = [td.text.strip() for td in tr.find_all('td')]
+            hours[values[0]] = tuple(int(value) for value in values[1:6])
+    courses = []
+    course_table = legend_table(soup, 'Course Legend')
+    if course_table is not None:
+        for tr in course_table.find_all('tr')[1:]:
+            tds = tr.find_all('td')
+            color_div = tds[1].find('div', class_='legend-color')
+            courses.append({'code': tds[0].text.strip(),
+                            'color': get_color_from_style(color_div.get('style') if color_div else None) or 'ffffff',
+                            'name': tds[2].text.strip(), 'faculty': tds[3].text.strip(),
+                            'hours': hours.get(tds[0].text.strip())})
+
+    return {'dept': dept, 'sem': sem, 'section': section, 'periods': periods, 'days': days, 'courses': courses}
+
 def main():
+    parser = argparse.ArgumentParser(description="Combine the generated HTML timetables into Excel")
+    parser.add_argument('--by-department', action='store_true',
+                        help="write one workbook per department instead of all_timetables.xlsx")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="number of processes writing department workbooks")
+    args = parser.parse_args()
+    
     # Set up directories
     base_dir = os.path.dirname(__file__)
     html_dir = os.path.join(base_dir, 'output', 'html')
     excel_dir = os.path.join(base_dir, 'output', 'excel')
-    os.makedirs(excel_dir, exist_ok=True)
-    
-    # Create single workbook for all timetables
-    wb = Workbook()
-    wb.remove(wb.active)  # Remove default sheet
     
     # Process all HTML timetables
     html_files = [f for f in os.listdir(html_dir) if f.startswith('timetable_') and f.endswith('.html')]
@@ -135,24 +344,25 @@ def main():
     # Sort files to group by department and semester
     html_files.sort()
     
+    model = []
     for html_file in html_files:
         try:
-            # Extract department, semester and section info from filename
+            # Extract department, semester and section info from timetable_<dept>_semester_<sem>[_section_<x>]
             parts = html_file.replace('.html', '').split('_')
-            dept_name = parts[1]
-            term = parts[3]
-            section = parts[4] if len(parts) > 4 else None
+            sem_idx = parts.index('semester')
+            dept_name = '_'.join(parts[1:sem_idx])
+            term = parts[sem_idx + 1]
+            section = parts[sem_idx + 3] if len(parts) > sem_idx + 3 else None
             
             html_path = os.path.join(html_dir, html_file)
-            convert_html_to_excel(html_path, wb, dept_name, term, section)
+            model.append(read_section_html(html_path, dept_name, term, section))
             print(f"Added {html_file} to combined Excel file")
         except Exception as e:
             print(f"Error converting {html_file}: {str(e)}")
     
     # Save combined Excel file
     excel_path = os.path.join(excel_dir, 'all_timetables.xlsx')
-    wb.save(excel_path)
-    print(f"\nAll timetables have been saved to {excel_path}")
+    export_model_to_excel(model, excel_path, by_department=args.by_department, jobs=args.jobs)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,70 @@
+"""Compact, array-backed timetable grid for one section.
+
+Instead of a dict per (day, period) the grid keeps one flat ``array`` of
+placement ids indexed by ``day * num_periods + period`` plus per-day
+bitmasks of busy periods and block starts. Session records are interned:
+each placed block is stored once in ``placements`` and every cell it covers
+refers to it by id.
+"""
+from array import array
+
+from occupancy import block_mask, free_starts, lowest_bit, iter_bits
+
+
+class ScheduleGrid:
+    __slots__ = ('num_days', 'num_periods', 'cells', 'placements', 'busy', 'starts',
+                 'course_starts', 'course_periods')
+
+    def __init__(self, num_days, num_periods):
+        self.num_days = num_days
+        self.num_periods = num_periods
+        # 0 marks a free cell, otherwise placement index + 1
+        self.cells = array('H', bytes(2 * num_days * num_periods))
+        self.placements = []
+        self.busy = [0] * num_days
+        self.starts = [0] * num_days
+        # course code -> per-day masks of block starts / of every period held
+        self.course_starts = {}
+        self.course_periods = {}
+
+    def place(self, session, day_idx, start_period):
+        """Record a session block starting at ``start_period`` on ``day_idx``"""
+        block = block_mask(start_period, session['blocks'])
+        self.placements.append((session, day_idx, start_period))
+        placement_id = len(self.placements)
+        offset = day_idx * self.num_periods + start_period
+        for period_idx in range(session['blocks']):
+            self.cells[offset + period_idx] = placement_id
+        self.busy[day_idx] |= block
+        self.starts[day_idx] |= 1 << start_period
+        code_id = session['code']
+        if code_id not in self.course_starts:
+            self.course_starts[code_id] = [0] * self.num_days
+            self.course_periods[code_id] = [0] * self.num_days
+        self.course_starts[code_id][day_idx] |= 1 << start_period
+        self.course_periods[code_id][day_idx] |= block
+
+    def cell(self, day_idx, period_idx):
+        """Session occupying a cell, or None if it is free"""
+        placement_id = self.cells[day_idx * self.num_periods + period_idx]
+        if not placement_id:
+            return None
+        return self.placements[placement_id - 1][0]
+
+    def is_block_start(self, day_idx, period_idx):
+        return bool(self.starts[day_idx] >> period_idx & 1)
+
+    def course_periods_on(self, day_idx, code_id):
+        """Periods of a day held by a course"""
+        return list(iter_bits(self.course_periods.get(code_id, [0] * self.num_days)[day_idx]))
+
+    def first_free_run(self, day_idx, length, blocked_mask=0):
+        """First start period of ``length`` consecutive free periods (ignoring ``blocked_mask``), or -1"""
+        return lowest_bit(free_starts(self.busy[day_idx] | blocked_mask, length, self.num_periods))
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
@@ -0,0 +1,106 @@
+"""Persisted solver state for incremental rescheduling.
+
+After every run the placements of each (department, term) group are stored
+in ``output/.cache/timetable_state.pkl`` together with a fingerprint of the
+group's course rows, its break profile and its course colors. An incremental
+run matches the new session requests against that state, keeps every
+placement whose session is unchanged and re-solves only the rest.
+"""
+import os
+import pickle
+
+from data_loader import CACHE_DIR, write_pickle_atomic
+
+STATE_PATH = os.path.join(CACHE_DIR, 'timetable_state.pkl')
+STATE_VERSION = 1
+
+
+def group_key(group):
+    return group['dept'], group['term']
+
+
+def session_key(session):
+    """Everything that identifies a session request; any change makes it a new session"""
+    return session['type'], session['code'], session['name'], session['faculty'], session['venue'], session['blocks']
+
+
+def rows_fingerprint(rows):
+    """Stable fingerprint of a group's course rows (tuples of cell values), used to detect legend-only edits"""
+    return tuple(tuple(str(value) for value in row) for row in rows)
+
+
+def load_state(path=STATE_PATH):
+    """Previously saved solver state, or None if missing, unreadable or from another version"""
+    try:
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if not isinstance(state, dict) or state.get('version') != STATE_VERSION:
+        return None
+    return state
+
+
+def save_state(groups, results, engine, time_periods, path=STATE_PATH):
+    """Persist the placements of a finished run for the next incremental run"""
+    state = {
+        'version': STATE_VERSION,
+        'engine': engine,
+        'time_periods': list(time_periods),
+        'groups': {},
+    }
+    for group, (schedule, _) in zip(groups, results):
+        state['groups'][group_key(group)] = {
+            'rows': group['rows'],
+            'rest_mask': group['rest_mask'],
+            'colors': {code: details['color'] for code, details in group['subject_colors'].items()},
+            'placements': list(schedule['grid'].placements),
+        }
+    return write_pickle_atomic(path, state)
+
+
+def match_sessions(previous_placements, sessions):
+    """Pair current sessions with unchanged previous ones.
+
+    Returns ``(kept, dirty)``: ``kept`` lists ``(index, day_idx, start_period)``
+    for sessions that can reuse a previous placement and ``dirty`` lists the
+    indexes of sessions that must be solved again.
+    """
+    available = {}
+    for session, day_idx, start_period in previous_placements:
+        available.setdefault(session_key(session), []).append((day_idx, start_period))
+
+    kept, dirty = [], []
+    for index, session in enumerate(sessions):
+        slots = available.get(session_key(session))
+        if slots:
+            day_idx, start_period = slots.pop(0)
+            kept.append((index, day_idx, start_period))
+        else:
+            dirty.append(index)
+    return kept, dirty
+
+
+def placement_signature(placements):
+    """Order-independent summary of a group's placements, for change detection"""
+    return sorted((session_key(session), day_idx, start_period) for session, day_idx, start_period in placements)
+
+
+def reuse_course_colors(subject_colors, previous_colors, color_generator):
+    """Keep each course's previous color; give new courses the next color nobody uses.
+
+    Returns True if any course color differs from the previous run.
+    """
+    used = {previous_colors[code] for code in subject_colors if code in previous_colors}
+    changed = False
+    for code, details in subject_colors.items():
+        if code in previous_colors:
+            details['color'] = previous_colors[code]
+            continue
+        color = next(color_generator)
+        while color in used:
+            color = next(color_generator)
+        used.add(color)
+        details['color'] = color
+        changed = True
+    return changed or set(previous_colors) != set(subject_colors)
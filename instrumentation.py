@@ -0,0 +1,171 @@
+"""Optional counters and phase timings for a scheduling run.
+
+Off by default; ``main.py --profile`` or ``TIMETABLE_PROFILE=1`` turns it on.
+While enabled, hot paths record counts (retry attempts per session, feasible
+starts per ``find_best_slot`` call, ...) and phases are timed per
+``(dept, term)`` group. ``write_report`` prints a table and saves the same
+data as JSON. ``run_profiled`` adds cProfile and tracemalloc around a call.
+"""
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+
+ENV_VAR = 'TIMETABLE_PROFILE'
+REPORT_VERSION = 1
+
+enabled = os.environ.get(ENV_VAR, '') not in ('', '0')
+
+# name -> [count, total, max] of recorded values
+stats = {}
+# (phase, group) -> [calls, seconds]; group is 'dept term' or '' for run-wide phases
+phase_times = {}
+current_group = ''
+
+
+def enable(on=True):
+    global enabled
+    enabled = on
+
+
+def reset():
+    """Forget everything recorded so far"""
+    global current_group
+    stats.clear()
+    phase_times.clear()
+    current_group = ''
+
+
+def set_group(dept, term):
+    """Attribute the following phases to a (dept, term) group"""
+    global current_group
+    current_group = f"{dept} {term}" if dept is not None else ''
+
+
+def record(name, value=1):
+    """Add one observation of ``value`` to a counter"""
+    entry = stats.get(name)
+    if entry is None:
+        stats[name] = [1, value, value]
+    else:
+        entry[0] += 1
+        entry[1] += value
+        if value > entry[2]:
+            entry[2] = value
+
+
+# Shared by every phase entered while instrumentation is off
+NO_PHASE = nullcontext()
+
+
+def phase(name, group=None):
+    """Time a block under ``name`` for the current group (or ``group``); a shared no-op while disabled"""
+    if not enabled:
+        return NO_PHASE
+    return timed_phase((name, current_group if group is None else group))
+
+
+@contextmanager
+def timed_phase(key):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry = phase_times.setdefault(key, [0, 0.0])
+        entry[0] += 1
+        entry[1] += time.perf_counter() - start
+
+
+def snapshot():
+    """Picklable copy of everything recorded, for handing back from worker processes"""
+    return {'stats': {name: list(entry) for name, entry in stats.items()},
+            'phase_times': {key: list(entry) for key, entry in phase_times.items()}}
+
+
+def merge(recorded):
+    """Fold a worker's snapshot into this process's counters"""
+    for name, (count, total, maximum) in recorded['stats'].items():
+        entry = stats.setdefault(name, [0, 0, maximum])
+        entry[0] += count
+        entry[1] += total
+        entry[2] = max(entry[2], maximum)
+    for key, (calls, seconds) in recorded['phase_times'].items():
+        entry = phase_times.setdefault(key, [0, 0.0])
+        entry[0] += calls
+        entry[1] += seconds
+
+
+def summary():
+    """Counters and per-phase timings as plain JSON-ready data"""
+    counters = {name: {'count': count, 'total': total, 'max': maximum,
+                       'mean': round(total / count, 3) if count else 0}
+                for name, (count, total, maximum) in sorted(stats.items())}
+    phases, groups = {}, {}
+    for (name, group), (calls, seconds) in sorted(phase_times.items()):
+        totals = phases.setdefault(name, {'calls': 0, 'seconds': 0.0})
+        totals['calls'] += calls
+        totals['seconds'] += seconds
+        if group:
+            groups.setdefault(group, {})[name] = {'calls': calls, 'seconds': round(seconds, 6)}
+    for totals in phases.values():
+        totals['seconds'] = round(totals['seconds'], 6)
+    return {'version': REPORT_VERSION, 'counters': counters, 'phases': phases, 'groups': groups}
+
+
+def write_report(path):
+    """Print the summary as tables and save it as JSON at ``path``"""
+    report = summary()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n{'Phase':<28}{'Calls':>10}{'Seconds':>12}")
+    for name, totals in sorted(report['phases'].items(), key=lambda item: -item[1]['seconds']):
+        print(f"{name:<28}{totals['calls']:>10}{totals['seconds']:>12.3f}")
+
+    print(f"\n{'Counter':<36}{'Count':>10}{'Total':>12}{'Mean':>10}{'Max':>8}")
+    for name, counter in report['counters'].items():
+        print(f"{name:<36}{counter['count']:>10}{counter['total']:>12}{counter['mean']:>10}{counter['max']:>8}")
+
+    # Slowest groups first, one column per phase that is timed per group
+    group_phase_names = sorted({name for group_phases in report['groups'].values() for name in group_phases})
+    slowest = sorted(report['groups'].items(), key=lambda item: -sum(p['seconds'] for p in item[1].values()))
+    print(f"\n{'Group':<20}" + ''.join(f"{name:>14}" for name in group_phase_names))
+    for group, group_phases in slowest[:20]:
+        print(f"{group:<20}" + ''.join(f"{group_phases.get(name, {}).get('seconds', 0):>14.4f}"
+                                       for name in group_phase_names))
+    print(f"\nProfile report has been saved to {path}")
+    return report
+
+
+def run_profiled(func, profile_dir, use_cprofile=False, use_tracemalloc=False, **kwargs):
+    """Call ``func(**kwargs)`` under cProfile and/or tracemalloc, saving their output to ``profile_dir``"""
+    os.makedirs(profile_dir, exist_ok=True)
+    profiler = None
+    if use_cprofile:
+        import cProfile
+        profiler = cProfile.Profile()
+    if use_tracemalloc:
+        import tracemalloc
+        tracemalloc.start()
+
+    try:
+        if profiler:
+            result = profiler.runcall(func, **kwargs)
+        else:
+            result = func(**kwargs)
+    finally:
+        if profiler:
+            stats_path = os.path.join(profile_dir, f'{func.__name__}.prof')
+            profiler.dump_stats(stats_path)
+            print(f"cProfile stats have been saved to {stats_path} (inspect with python -m pstats)")
+        if use_tracemalloc:
+            current, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics('lineno')[:15]
+            tracemalloc.stop()
+            memory_path = os.path.join(profile_dir, 'tracemalloc.txt')
+            with open(memory_path, 'w', encoding='utf-8') as f:
+                f.write(f"current {current} bytes, peak {peak} bytes\n")
+                f.writelines(f"{line}\n" for line in top)
+            print(f"Peak traced memory {peak / 2**20:.1f} MiB; top allocations saved to {memory_path}")
+    return result
@@ -0,0 +1,256 @@
+"""Simulated-annealing improvement pass over a solved timetable.
+
+Every session is an item with a position ``(day_idx, start_period)``, or
+``None`` if it could not be placed. Items occupy resources (the section grid,
+a faculty member, rooms); resource clashes and breaks stay hard constraints.
+The cost is the weighted timetable quality score: unplaced sessions,
+same-course gap violations, faculty back-to-back sessions and lectures away
+from breaks.
+
+Three neighbourhoods are sampled: relocate one session to another day/start,
+swap two sessions of the same section, and insert an unplaced session. A move
+is evaluated by recomputing only the cost buckets it touches, i.e. one
+(section, course, day) bucket for gaps and one (faculty, day) bucket for
+back-to-back sessions per old and new position, so a move costs the same no
+matter how large the timetable is.
+"""
+import math
+import time
+
+from occupancy import block_mask, free_starts, iter_bits
+
+START_TEMPERATURE = 5.0
+END_TEMPERATURE = 0.05
+CLOCK_CHECK_INTERVAL = 64
+
+
+def improve_placements(items, num_days, num_periods, weights, rng, time_budget, max_moves=None, min_gap=6):
+    """Improve item positions within ``time_budget`` seconds and/or ``max_moves`` moves (0/None: no limit).
+
+    ``items`` is a list of dicts with ``kind``, ``code``, ``blocks``,
+    ``resources`` (hashable keys of the resources the session occupies),
+    ``group``, ``faculty`` (None if no faculty load applies), ``rest_mask``,
+    ``near_mask`` and ``pos``. ``weights`` holds the penalties for
+    ``unplaced``, ``gap_violations``, ``back_to_back`` and ``far_from_break``.
+
+    Returns ``(positions, stats)`` with the best positions found.
+    """
+    positions = [item['pos'] for item in items]
+    # Per resource and day: periods held by at least one item, and how many items hold each period
+    masks = {}
+    holder_counts = {}
+    # Unplaced items as a list for random choice, with each item's index in it for O(1) removal
+    unplaced = []
+    unplaced_slot = {}
+    gap_buckets = {}
+    load_buckets = {}
+    group_items = {}
+
+    for index, item in enumerate(items):
+        group_items.setdefault(item['group'], []).append(index)
+        for key in item['resources']:
+            if key not in masks:
+                masks[key] = [0] * num_days
+                holder_counts[key] = [[0] * num_periods for _ in range(num_days)]
+
+    def gap_key(index, day_idx):
+        return items[index]['group'], items[index]['code'], day_idx
+
+    def gap_cost(key):
+        starts = sorted(positions[index][1] for index in gap_buckets.get(key, ()))
+        return weights['gap_violations'] * sum(1 for first, second in zip(starts, starts[1:])
+                                               if second - first <= min_gap)
+
+    def load_cost(key):
+        blocks = sorted((positions[index][1], positions[index][1] + items[index]['blocks'])
+                        for index in load_buckets.get(key, ()))
+        return weights['back_to_back'] * sum(1 for (_, end), (start, _) in zip(blocks, blocks[1:]) if start == end)
+
+    def item_cost(index):
+        item = items[index]
+        if positions[index] is None:
+            return weights['unplaced']
+        day_idx, start_period = positions[index]
+        if item['kind'] == 'LEC' and not block_mask(start_period, item['blocks']) & item['near_mask']:
+            return weights['far_from_break']
+        return 0
+
+    def buckets_of(index, pos):
+        if pos is None:
+            return []
+        keys = [('gap', gap_key(index, pos[0]))]
+        if items[index]['faculty'] is not None:
+            keys.append(('load', (items[index]['faculty'], pos[0])))
+        return keys
+
+    def bucket_cost(bucket):
+        kind, key = bucket
+        return gap_cost(key) if kind == 'gap' else load_cost(key)
+
+    def mark_unplaced(index):
+        unplaced_slot[index] = len(unplaced)
+        unplaced.append(index)
+
+    def unmark_unplaced(index):
+        slot = unplaced_slot.pop(index)
+        last = unplaced.pop()
+        if last != index:
+            unplaced[slot] = last
+            unplaced_slot[last] = slot
+
+    def place(index, pos):
+        positions[index] = pos
+        if pos is None:
+            if index not in unplaced_slot:
+                mark_unplaced(index)
+            return
+        if index in unplaced_slot:
+            unmark_unplaced(index)
+        day_idx, start_period = pos
+        periods = range(start_period, start_period + items[index]['blocks'])
+        block = block_mask(start_period, items[index]['blocks'])
+        for key in items[index]['resources']:
+            masks[key][day_idx] |= block
+            counts = holder_counts[key][day_idx]
+            for period in periods:
+                counts[period] += 1
+        gap_buckets.setdefault(gap_key(index, day_idx), set()).add(index)
+        if items[index]['faculty'] is not None:
+            load_buckets.setdefault((items[index]['faculty'], day_idx), set()).add(index)
+
+    def lift(index):
+        pos = positions[index]
+        positions[index] = None
+        if pos is None:
+            return pos
+        mark_unplaced(index)
+        day_idx, start_period = pos
+        for key in items[index]['resources']:
+            # A period stays busy while another item holds it: initial timetables may already double-book
+            counts = holder_counts[key][day_idx]
+            for period in range(start_period, start_period + items[index]['blocks']):
+                counts[period] -= 1
+                if not counts[period]:
+                    masks[key][day_idx] &= ~(1 << period)
+        gap_buckets[gap_key(index, day_idx)].discard(index)
+        if items[index]['faculty'] is not None:
+            load_buckets[(items[index]['faculty'], day_idx)].discard(index)
+        return pos
+
+    def open_starts(index, day_idx):
+        """Start periods where a lifted item fits on a day"""
+        item = items[index]
+        busy = item['rest_mask']
+        for key in item['resources']:
+            busy |= masks[key][day_idx]
+        if item['kind'] == 'LEC':
+            # Same lecture may not reuse a period it already starts in on another day
+            for other_day in range(num_days):
+                for other in gap_buckets.get(gap_key(index, other_day), ()):
+                    busy |= 1 << positions[other][1]
+        return free_starts(busy, item['blocks'], num_periods)
+
+    def fits(index, pos):
+        return bool(open_starts(index, pos[0]) >> pos[1] & 1)
+
+    def random_slot(index):
+        days = list(range(num_days))
+        rng.shuffle(days)
+        for day_idx in days:
+            starts = list(iter_bits(open_starts(index, day_idx)))
+            if starts:
+                return day_idx, rng.choice(starts)
+        return None
+
+    def touched_buckets(indexes, old_positions, new_positions):
+        buckets = set()
+        for index, old, new in zip(indexes, old_positions, new_positions):
+            buckets.update(buckets_of(index, old))
+            buckets.update(buckets_of(index, new))
+        return buckets
+
+    for index, pos in enumerate(positions):
+        place(index, pos)
+
+    total = sum(item_cost(index) for index in range(len(items)))
+    total += sum(gap_cost(key) for key in gap_buckets) + sum(load_cost(key) for key in load_buckets)
+    stats = {'initial_cost': total, 'moves': 0, 'accepted': 0}
+    best_cost, best_positions = total, list(positions)
+    # Items moved since best_positions was last brought up to date
+    changed = set()
+    placed_groups = [group for group, indexes in group_items.items() if len(indexes) > 1]
+
+    start_time = time.perf_counter()
+    temperature = START_TEMPERATURE
+    while max_moves is None or stats['moves'] < max_moves:
+        if stats['moves'] % CLOCK_CHECK_INTERVAL == 0:
+            progress = (time.perf_counter() - start_time) / time_budget if time_budget else 0.0
+            if max_moves:
+                progress = max(progress, stats['moves'] / max_moves)
+            if progress >= 1.0:
+                break
+            temperature = START_TEMPERATURE * (END_TEMPERATURE / START_TEMPERATURE) ** progress
+        stats['moves'] += 1
+
+        # Pick a neighbourhood: insert an unplaced session, swap two sessions of a section, or relocate one
+        if rng.random() < 0.1 and unplaced:
+            indexes = [rng.choice(unplaced)]
+        elif placed_groups and rng.random() < 0.3:
+            indexes = rng.sample(group_items[rng.choice(placed_groups)], 2)
+            if positions[indexes[0]] is None or positions[indexes[1]] is None:
+                continue
+        else:
+            indexes = [rng.randrange(len(items))]
+            if positions[indexes[0]] is None:
+                continue
+
+        old_positions = [positions[index] for index in indexes]
+        if len(indexes) == 1:
+            old_positions = [lift(indexes[0])]
+            target = random_slot(indexes[0])
+            new_positions = [target]
+            feasible = target is not None and target != old_positions[0]
+        else:
+            new_positions = [old_positions[1], old_positions[0]]
+            for index in indexes:
+                lift(index)
+            feasible = fits(indexes[0], new_positions[0])
+            if feasible:
+                place(indexes[0], new_positions[0])
+                feasible = fits(indexes[1], new_positions[1])
+                lift(indexes[0])
+        if not feasible:
+            for index, pos in zip(indexes, old_positions):
+                place(index, pos)
+            continue
+
+        # Delta evaluation: only the touched buckets and the moved items
+        buckets = touched_buckets(indexes, old_positions, new_positions)
+        for index, pos in zip(indexes, old_positions):
+            place(index, pos)
+        before = sum(bucket_cost(bucket) for bucket in buckets) + sum(item_cost(index) for index in indexes)
+        for index in indexes:
+            lift(index)
+        for index, pos in zip(indexes, new_positions):
+            place(index, pos)
+        after = sum(bucket_cost(bucket) for bucket in buckets) + sum(item_cost(index) for index in indexes)
+        delta = after - before
+
+        if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+            total += delta
+            stats['accepted'] += 1
+            changed.update(indexes)
+            if total < best_cost:
+                best_cost = total
+                for index in changed:
+                    best_positions[index] = positions[index]
+                changed.clear()
+        else:
+            for index in indexes:
+                lift(index)
+            for index, pos in zip(indexes, old_positions):
+                place(index, pos)
+
+    stats['final_cost'] = best_cost
+    stats['seconds'] = round(time.perf_counter() - start_time, 3)
+    return best_positions, stats
@@ -1,7 +1,25 @@
-import pandas as pd
 import random
+import re
 from datetime import datetime, time, timedelta
 import os
+import sys
+import argparse
+import copy
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+from occupancy import block_mask, new_day_masks, free_starts, overlapping_starts, lowest_bit, iter_bits, mask_runs
+from csp_engine import solve_sessions
+from local_search import improve_placements
+from capacity import analyze_capacity
+from grid import ScheduleGrid
+from render import render_section, render_index, render_link_index
+from publish import PageWriter
+from model_store import MODEL_PATH, ModelFormatError, save_model, load_model
+import instrumentation
+from data_loader import (HOUR_COLUMNS, load_course_table, load_faculty_table, is_missing, clean_faculty_name,
+                         room_names)
+from incremental import (group_key, rows_fingerprint, load_state, save_state, match_sessions,
+                         reuse_course_colors, placement_signature)
 
 # Constants
 WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
@@ -54,59 +72,90 @@ CSE_SECTIONS = ['A', 'B']
 # Global time periods
 TIME_PERIODS = []
 
-# Global faculty schedule tracking
+# Break profiles compiled once from DEPT_BREAK_SLOTS: (dept, sem_key) -> bitmask over TIME_PERIODS
+BREAK_MASKS = {}
+NEAR_BREAK_MASKS = {}
+DEFAULT_BREAK_MASK = 0
+DEFAULT_NEAR_BREAK_MASK = 0
+
+# Faculty directory: every cleaned faculty name gets an integer ID, used as the key of all faculty bookings
+TBA_FACULTY_ID = 0
+FACULTY_NAMES = ["TBA"]
+FACULTY_IDS = {"TBA": TBA_FACULTY_ID}
+
+# Global faculty schedule tracking, keyed by faculty ID
 faculty_schedule = {}
 
+# Global room availability tracking, shared by every department and semester in a run
+room_schedule = {}
+
+# Run-wide course index: course code -> per-day masks of the periods it holds in any section
+course_schedule = {}
+
+# Elective basket placeholders (B1, B2-ISP, B1(HS151/...)) stand for a different course in every section
+BASKET_CODE = re.compile(r'B\d+\b')
+
+# Run-wide occupancy indexes by resource kind, as used in parallel claims
+SHARED_SCHEDULES = {'faculty': faculty_schedule, 'room': room_schedule, 'course': course_schedule}
+
+# Lecture slot scoring used by the random engine: 'bitmask' (find_best_slot per day) or 'numpy' (all days at once)
+LECTURE_SCORING = 'bitmask'
+
 def initialize_time_periods():
     global TIME_PERIODS
     TIME_PERIODS = create_time_periods()
-
-def clean_faculty_name(name):
-    """Clean and standardize faculty names"""
-    if pd.isna(name):
-        return "TBA"
-    name = str(name).strip()
-    # Handle multiple faculty names (take the first one)
-    if '/' in name:
-        name = name.split('/')[0].strip()
-    if '&' in name:
-        name = name.split('&')[0].strip()
-    if '(' in name:
-        name = name.split('(')[0].strip()
-    if 'and' in name.lower():
-        name = name.split('and')[0].strip()
-    return name
+    compile_break_masks()
 
 def initialize_faculty_schedule():
-    """Initialize empty schedule for all faculty members with improved name handling"""
+    """Assign faculty IDs and initialize an empty schedule for every faculty member"""
     global faculty_schedule
     faculty_schedule.clear()
+    del FACULTY_NAMES[1:]
+    FACULTY_IDS.clear()
+    FACULTY_IDS["TBA"] = TBA_FACULTY_ID
     
     # Read faculty data
-    faculty_df = pd.read_csv('faculty.csv')
-    combined_df = pd.read_excel('combined2.xlsx')
+    faculty_df = load_faculty_table()
+    combined_df = load_course_table()
     
     # Clean and standardize faculty names
-    all_faculty = set(clean_faculty_name(name) for name in faculty_df['Faculty Name'].unique())
-    all_faculty.update(clean_faculty_name(name) for name in combined_df['Faculty'].unique())
+    all_faculty = set(faculty_df['Faculty Clean'])
+    all_faculty.update(combined_df['Faculty Clean'])
     
     # Remove empty or invalid names
     all_faculty = {name for name in all_faculty if name and name != "TBA"}
     
-    # Initialize schedule for each faculty member
-    for faculty in all_faculty:
-        faculty_schedule[faculty] = {day_idx: set() for day_idx in range(len(WEEKDAYS))}
+    # Initialize schedule for each faculty member; IDs follow name order so a run is reproducible
+    for faculty in sorted(all_faculty):
+        faculty_schedule[faculty_id(faculty)] = new_day_masks(len(WEEKDAYS))
+
+def faculty_id(instructor):
+    """Integer ID of a faculty member given a raw or cleaned name; unknown names are registered"""
+    name = clean_faculty_name(instructor)
+    if name not in FACULTY_IDS:
+        FACULTY_IDS[name] = len(FACULTY_NAMES)
+        FACULTY_NAMES.append(name)
+    return FACULTY_IDS[name]
 
-def create_course_color():
+def initialize_room_schedule(data_frame):
+    """Initialize empty availability for every classroom and lab named in the course table (and the course index)"""
+    room_schedule.clear()
+    course_schedule.clear()
+    for column in ('Classroom', 'Lab_room'):
+        for venue in data_frame[column].unique():
+            for room in room_names(venue):
+                room_schedule[room] = new_day_masks(len(WEEKDAYS))
+
+def create_course_color(rng=random):
     """Generate unique colors for courses from the palette or random if needed"""
     for shade in VISUAL_PALETTE:
         yield shade
     
     # If we run out of predefined colors, generate random ones
     while True:
-        red = format(random.randint(180, 255), '02x')
-        green = format(random.randint(180, 255), '02x')
-        blue = format(random.randint(180, 255), '02x')
+        red = format(rng.randint(180, 255), '02x')
+        green = format(rng.randint(180, 255), '02x')
+        blue = format(rng.randint(180, 255), '02x')
         yield f"{red}{green}{blue}"
 
 def create_time_periods():
@@ -124,159 +173,1016 @@ def create_time_periods():
     
     return periods
 
-# Load data from Excel
-try:
-    data_frame = pd.read_excel('combined2.xlsx', sheet_name='Sheet1')
-except FileNotFoundError:
-    print("Error: File 'combined.xlsx' not found in the current directory")
-    exit()
-
-def get_break_slot(dept, sem, section=None):
-    """Get the break slot offset for a department/semester/section"""
-    if dept not in DEPT_BREAK_SLOTS:
-        return 0
-        
-    sem_key = f"{sem}"
-    if section:
-        sem_key += section
-    
-    dept_breaks = DEPT_BREAK_SLOTS[dept]
-    return dept_breaks.get(sem_key, 0)
-
-def is_rest_period(period, dept=None, sem=None, section=None):
-    """Check if a time slot falls within break times with dynamic lunch breaks"""
+def compute_rest_period(period, break_offset):
+    """Check if a time slot falls within break times for a given lunch offset (uncached)"""
     begin, end = period
     
     # Morning break: 10:30-11:00
-    if time(10, 30) <= begin < time(11, 0):
+    if MORNING_BREAK_TIME <= begin < time(11, 0):
         return True
         
     # Dynamic lunch break
     if LUNCH_START <= begin < LUNCH_END:
-        # Get department's break slot offset (0, 1, or 2 representing 30-minute offsets)
-        break_offset = get_break_slot(dept, sem, section)
+        # break_offset is 0, 1, or 2 representing 30-minute offsets
         break_start = datetime.combine(datetime.today(), LUNCH_START) + timedelta(minutes=30 * break_offset)
         break_end = break_start + timedelta(minutes=30 * BREAK_DURATION)
         
         # Check if current time falls within this department's break window
-        current_time = datetime.combine(datetime.today(), begin)
         return break_start.time() <= begin < break_end.time()
         
     return False
 
-def is_course_scheduled_simultaneously(schedule_grid, period, code_id):
-    """Check if the same course is scheduled in any other section at the same time"""
-    for day_schedule in schedule_grid.values():
-        if day_schedule[period]['code'] == code_id:
-            return True
-    return False
+def near_break_mask(rest_mask):
+    """Bitmask of periods within 2 slots of a break period"""
+    mask = rest_mask
+    for offset in (1, 2):
+        mask |= (rest_mask << offset) | (rest_mask >> offset)
+    return mask & ((1 << len(TIME_PERIODS)) - 1)
 
-def has_minimum_gap(schedule_grid, day_idx, start_period, code_id, min_gap=6):
-    """Check if there's enough gap between lectures of the same course"""
-    # Check backwards
-    for i in range(max(0, start_period - min_gap), start_period):
-        if schedule_grid[day_idx][i]['code'] == code_id:
-            return False
-            
-    # Check forwards
-    for i in range(start_period + 1, min(len(TIME_PERIODS), start_period + min_gap + 1)):
-        if schedule_grid[day_idx][i]['code'] == code_id:
-            return False
-            
-    return True
-
-def is_faculty_available(instructor, day_idx, start_period, num_blocks):
-    """Check if faculty member is available with improved name handling"""
-    global faculty_schedule
-    instructor = clean_faculty_name(instructor)
+def compile_break_masks():
+    """Compile DEPT_BREAK_SLOTS into per-section break and near-break bitmasks"""
+    global DEFAULT_BREAK_MASK, DEFAULT_NEAR_BREAK_MASK
+    BREAK_MASKS.clear()
+    NEAR_BREAK_MASKS.clear()
     
-    if instructor == "TBA":
-        return True
+    offset_masks = {}
+    offsets = {0} | {offset for dept_breaks in DEPT_BREAK_SLOTS.values() for offset in dept_breaks.values()}
+    for offset in offsets:
+        mask = 0
+        for period_idx, period in enumerate(TIME_PERIODS):
+            if compute_rest_period(period, offset):
+                mask |= 1 << period_idx
+        offset_masks[offset] = mask
+    
+    for dept, dept_breaks in DEPT_BREAK_SLOTS.items():
+        for sem_key, offset in dept_breaks.items():
+            BREAK_MASKS[(dept, sem_key)] = offset_masks[offset]
+            NEAR_BREAK_MASKS[(dept, sem_key)] = near_break_mask(offset_masks[offset])
+    
+    DEFAULT_BREAK_MASK = offset_masks[0]
+    DEFAULT_NEAR_BREAK_MASK = near_break_mask(DEFAULT_BREAK_MASK)
+
+def rest_period_mask(dept=None, sem=None, section=None):
+    """Bitmask of break periods in a day for a department/semester/section"""
+    return BREAK_MASKS.get((dept, f"{sem}{section or ''}"), DEFAULT_BREAK_MASK)
+
+def near_rest_period_mask(dept=None, sem=None, section=None):
+    """Bitmask of periods within 2 slots of a break for a department/semester/section"""
+    return NEAR_BREAK_MASKS.get((dept, f"{sem}{section or ''}"), DEFAULT_NEAR_BREAK_MASK)
+
+def new_section_schedule(dept=None, sem=None, section=None):
+    """Empty schedule for one department/semester/section with its occupancy indexes"""
+    return {
+        'dept': dept,
+        'sem': sem,
+        'section': section,
+        'grid': ScheduleGrid(len(WEEKDAYS), len(TIME_PERIODS)),
+        'teacher_bookings': {},
+    }
+
+def booking_masks(bookings, key):
+    """Per-day masks of a teacher or room in a bookings dict, created on first use"""
+    if key not in bookings:
+        bookings[key] = new_day_masks(len(WEEKDAYS))
+    return bookings[key]
+
+def is_shared_course(code_id):
+    """Whether a course code names the same course in every section, i.e. belongs in the run-wide course index"""
+    return not BASKET_CODE.match(code_id)
+
+def booked_venue(session):
+    """Venue whose rooms a session books; a basket placeholder lists one room per elective, so it books none"""
+    return session['venue'] if is_shared_course(session['code']) else None
+
+def course_elsewhere_mask(schedule, code_id, day_idx):
+    """Periods of a day in which a course is held by any other section, from the run-wide course index"""
+    held = course_schedule.get(code_id)
+    if not held:
+        return 0
+    own = schedule['grid'].course_periods.get(code_id)
+    return held[day_idx] & ~own[day_idx] if own else held[day_idx]
+
+def faculty_busy_mask(faculty, day_idx):
+    """Bitmask of periods a faculty member (by ID) is already booked on a day"""
+    if faculty == TBA_FACULTY_ID:
+        return 0
+    if faculty not in faculty_schedule:
+        faculty_schedule[faculty] = new_day_masks(len(WEEKDAYS))
+    return faculty_schedule[faculty][day_idx]
+
+def mark_faculty_busy(faculty, day_idx, start_period, num_blocks):
+    """Mark a faculty member (by ID) as busy for a block"""
+    if faculty == TBA_FACULTY_ID:
+        return
+    faculty_busy_mask(faculty, day_idx)
+    faculty_schedule[faculty][day_idx] |= block_mask(start_period, num_blocks)
+
+def room_busy_mask(venue, day_idx):
+    """Bitmask of periods in which any room of a venue is already booked on a day"""
+    mask = 0
+    for room in room_names(venue):
+        if room not in room_schedule:
+            room_schedule[room] = new_day_masks(len(WEEKDAYS))
+        mask |= room_schedule[room][day_idx]
+    return mask
+
+def mark_room_busy(venue, day_idx, start_period, num_blocks):
+    """Book every room of a venue for a block"""
+    room_busy_mask(venue, day_idx)
+    for room in room_names(venue):
+        room_schedule[room][day_idx] |= block_mask(start_period, num_blocks)
+
+def free_rooms(day_idx, start_period, num_blocks, rooms=None):
+    """All rooms (of the given ones, or every known room) free for a whole block"""
+    block = block_mask(start_period, num_blocks)
+    candidates = room_schedule if rooms is None else rooms
+    return sorted(room for room in candidates
+                  if not room_schedule.get(room, new_day_masks(len(WEEKDAYS)))[day_idx] & block)
+
+def find_best_slot(schedule, faculty, venue, num_blocks, day_idx, code_id, session_type='LEC'):
+    """Find the best available time slot for a faculty ID considering proximity to breaks"""
+    num_periods = len(TIME_PERIODS)
+    dept, sem, section = schedule['dept'], schedule['sem'], schedule['section']
+    
+    # Everything that blocks a period: bookings, the section grid, breaks and global faculty load
+    busy = session_busy_mask(schedule, faculty, venue, day_idx, code_id)
+    
+    blocked_starts = 0
+    course_starts = schedule['grid'].course_starts.get(code_id)
+    if course_starts:
+        # Same course may not share a period with itself on another day
+        for day_mask in course_starts:
+            busy |= day_mask
+        # Minimum gap of 6 periods between sessions of the same course on this day
+        for offset in range(1, 7):
+            blocked_starts |= (course_starts[day_idx] << offset) | (course_starts[day_idx] >> offset)
+    
+    candidates = free_starts(busy, num_blocks, num_periods) & ~blocked_starts
+    if instrumentation.enabled:
+        instrumentation.record('find_best_slot.feasible_starts', bin(candidates).count('1'))
+    
+    # For lectures, prioritize slots near breaks
+    if session_type == 'LEC':
+        near_break = candidates & overlapping_starts(near_rest_period_mask(dept, sem, section), num_blocks)
+        if near_break:
+            return lowest_bit(near_break)
+    
+    return lowest_bit(candidates)
+
+def find_best_slots_vectorized(schedule, faculty, venue, num_blocks, code_id, session_type='LEC'):
+    """Batched find_best_slot: best start period for every day at once (-1 where nothing fits)"""
+    from vector_scoring import best_lecture_starts
+    
+    dept, sem, section = schedule['dept'], schedule['sem'], schedule['section']
+    busy_masks = [session_busy_mask(schedule, faculty, venue, day_idx, code_id) for day_idx in range(len(WEEKDAYS))]
+    return best_lecture_starts(
+        busy_masks, schedule['grid'].course_starts.get(code_id),
+        near_rest_period_mask(dept, sem, section), num_blocks, len(TIME_PERIODS),
+        prefer_near_break=session_type == 'LEC'
+    )
+
+def book_session(schedule, session, day_idx, start_period):
+    """Commit a session block to the section grid and every occupancy index"""
+    num_blocks = session['blocks']
+    block = block_mask(start_period, num_blocks)
+    mark_faculty_busy(session['faculty_id'], day_idx, start_period, num_blocks)
+    booking_masks(schedule['teacher_bookings'], session['faculty_id'])[day_idx] |= block
+    mark_room_busy(booked_venue(session), day_idx, start_period, num_blocks)
+    if is_shared_course(session['code']):
+        booking_masks(course_schedule, session['code'])[day_idx] |= block
+    schedule['grid'].place(session, day_idx, start_period)
+
+def new_session(session_type, code_id, subj_name, instructor, venue, num_blocks):
+    """A single lab, lecture or tutorial block that needs a slot; bookings use its faculty ID"""
+    return {'type': session_type, 'code': code_id, 'name': subj_name,
+            'faculty': instructor, 'faculty_id': faculty_id(instructor), 'venue': venue, 'blocks': num_blocks}
+
+def build_session_requests(courses, subject_colors, color_generator):
+    """Expand the course records of a section into session requests, labs first, assigning course colors"""
+    sessions = []
+    
+    # First schedule all labs since they're less flexible
+    for course in courses:
+        if course['P'] <= 0:
+            continue
+        code_id = course['code']
         
-    if instructor not in faculty_schedule:
-        faculty_schedule[instructor] = {day_idx: set() for day_idx in range(len(WEEKDAYS))}
+        # Assign a color to this course if not already assigned
+        if code_id not in subject_colors:
+            subject_colors[code_id] = {"color": next(color_generator), "name": course['name'], "faculty": course['faculty']}
         
-    # Check if faculty is free for all required slots
-    for i in range(num_blocks):
-        if start_period + i in faculty_schedule[instructor][day_idx]:
-            return False
-    return True
-
-def mark_faculty_busy(instructor, day_idx, start_period, num_blocks):
-    """Mark faculty as busy with improved name handling"""
-    global faculty_schedule
-    instructor = clean_faculty_name(instructor)
+        # Regardless of P value (2 or more), schedule only one 2-hour lab session per week
+        lab_venue = course['lab_room'] if course['lab_room'] is not None else course['classroom']
+        sessions.append(new_session('LAB', code_id, course['name'], course['faculty'], lab_venue, LAB_BLOCKS))
     
-    if instructor == "TBA":
-        return
+    # Now process all subjects that have lectures or tutorials
+    for course in courses:
+        if course['L'] <= 0 and course['T'] <= 0:
+            continue
+        code_id = course['code']
+        lecture_hours = course['L']
         
-    for i in range(num_blocks):
-        faculty_schedule[instructor][day_idx].add(start_period + i)
-
-def is_near_break(period_idx, dept, sem, section):
-    """Check if a time slot is near a break period"""
-    # Check 2 slots before and after
-    for i in range(max(0, period_idx - 2), min(len(TIME_PERIODS), period_idx + 3)):
-        if is_rest_period(TIME_PERIODS[i], dept, sem, section):
-            return True
-    return False
+        # For 3-hour lecture courses, schedule exactly 2 lectures of 1.5 hours each
+        # For 6-hour lecture courses, schedule exactly 4 lectures of 1.5 hours each
+        if lecture_hours == 3:
+            num_lectures = 2
+        elif lecture_hours == 6:
+            num_lectures = 4
+        else:
+            num_lectures = lecture_hours
+        
+        # Assign a color to this course if not already assigned
+        if code_id not in subject_colors:
+            subject_colors[code_id] = {"color": next(color_generator), "name": course['name'], "faculty": course['faculty']}
+        
+        # Lectures are 1.5 hours each, tutorials 1 hour
+        for _ in range(num_lectures):
+            sessions.append(new_session('LEC', code_id, course['name'], course['faculty'], course['classroom'],
+                                        LECTURE_BLOCKS))
+        for _ in range(course['T']):
+            sessions.append(new_session('TUT', code_id, course['name'], course['faculty'], course['classroom'],
+                                        TUTORIAL_BLOCKS))
+    
+    return sessions
 
-def find_best_slot(schedule_grid, teacher_bookings, room_bookings, instructor, venue, num_blocks, day_idx, code_id, dept=None, sem=None, section=None, session_type='LEC'):
-    """Find the best available time slot considering proximity to breaks"""
-    global TIME_PERIODS
-    best_slot = -1
-    min_conflicts = float('inf')
-    max_break_proximity = -1  # Track how close we are to breaks
-    
-    for start_period in range(len(TIME_PERIODS) - num_blocks + 1):
-        conflicts = 0
-        is_available = True
-        break_proximity = 0  # Higher value means closer to breaks
+def place_session_random(schedule, session, rng=random):
+    """Place a session: lectures try random days, labs and tutorials draw from every feasible start"""
+    place = try_place_session_random if session['type'] == 'LEC' else place_session_indexed
+    if not instrumentation.enabled:
+        return place(schedule, session, rng) is not None
+    with instrumentation.phase(f"place_{session['type'].lower()}"):
+        try_count = place(schedule, session, rng)
+    if try_count is not None:
+        instrumentation.record(f"random.{session['type']}.attempts", try_count + 1)
+    else:
+        instrumentation.record(f"random.{session['type']}.attempts", 1000 if session['type'] == 'LEC' else 1)
+        instrumentation.record(f"random.{session['type']}.failed")
+    return try_count is not None
+
+def try_place_session_random(schedule, session, rng=random):
+    """Retry loop for lectures over random days; returns the number of failed attempts, or None if nothing fit"""
+    num_blocks = session['blocks']
+    
+    # Nothing changes between attempts, so batched scoring ranks every day up front
+    best_starts = None
+    if LECTURE_SCORING == 'numpy':
+        best_starts = find_best_slots_vectorized(
+            schedule, session['faculty_id'], booked_venue(session), num_blocks, session['code'], 'LEC'
+        )
+    
+    try_count = 0
+    while try_count < 1000:
+        day_idx = rng.randint(0, len(WEEKDAYS)-1)
+        if len(TIME_PERIODS) >= num_blocks:
+            if best_starts is not None:
+                start_period = best_starts[day_idx]
+            else:
+                start_period = find_best_slot(
+                    schedule, session['faculty_id'], booked_venue(session), num_blocks, day_idx, session['code'], 'LEC'
+                )
+            if start_period != -1:
+                book_session(schedule, session, day_idx, start_period)
+                return try_count
+        try_count += 1
+    return None
+
+def session_busy_mask(schedule, faculty, venue, day_idx, code_id=None):
+    """Periods of a day a session cannot use in a section: bookings, grid, breaks and its course in other sections"""
+    busy = (booking_masks(schedule['teacher_bookings'], faculty)[day_idx] |
+            room_busy_mask(venue, day_idx) |
+            schedule['grid'].busy[day_idx] |
+            rest_period_mask(schedule['dept'], schedule['sem'], schedule['section']) |
+            faculty_busy_mask(faculty, day_idx))
+    if code_id is not None:
+        busy |= course_elsewhere_mask(schedule, code_id, day_idx)
+    return busy
+
+def course_clash_reason(schedule, session):
+    """Failure reason if only other sections holding the same course leave a session without a free block"""
+    fits_apart = fits_anyway = False
+    for day_idx in range(len(WEEKDAYS)):
+        busy = session_busy_mask(schedule, session['faculty_id'], booked_venue(session), day_idx)
+        fits_anyway |= bool(free_starts(busy, session['blocks'], len(TIME_PERIODS)))
+        busy |= course_elsewhere_mask(schedule, session['code'], day_idx)
+        fits_apart |= bool(free_starts(busy, session['blocks'], len(TIME_PERIODS)))
+    if fits_anyway and not fits_apart:
+        return f"{session['code']} is held by another section in every free block"
+    return None
+
+def place_session_indexed(schedule, session, rng=random):
+    """Book a lab or tutorial at a random one of all its feasible starts; returns 0, or None if none exists"""
+    candidates = []
+    for day_idx in range(len(WEEKDAYS)):
+        busy = session_busy_mask(schedule, session['faculty_id'], booked_venue(session), day_idx, session['code'])
+        candidates.extend((day_idx, start_period)
+                          for start_period in iter_bits(free_starts(busy, session['blocks'], len(TIME_PERIODS))))
+    if instrumentation.enabled:
+        instrumentation.record(f"random.{session['type']}.feasible_starts", len(candidates))
+    if not candidates:
+        return None
+    book_session(schedule, session, *rng.choice(candidates))
+    return 0
+
+def schedule_sessions_random(schedule, sessions, rng=random):
+    """Original heuristic: randomized retries per lecture, indexed draws for labs and tutorials; returns (session, reason) per failure"""
+    conflicts = []
+    for session in sessions:
+        if not place_session_random(schedule, session, rng):
+            reason = course_clash_reason(schedule, session)
+            if reason:
+                conflicts.append((session, reason))
+            elif session['type'] == 'LEC':
+                conflicts.append((session, "no free slot found after 1000 random attempts"))
+            else:
+                conflicts.append((session, "no feasible start on any day"))
+    return conflicts
+
+def schedule_sessions_csp(schedule, sessions, rng=random):
+    """Constraint-propagation engine with backtracking; returns (session, reason) for each failure"""
+    variables = []
+    resource_masks = {('section',): schedule['grid'].busy}
+    for session in sessions:
+        faculty = session['faculty_id']
+        resources = [('section',), ('teacher', faculty)]
+        resource_masks[('teacher', faculty)] = booking_masks(schedule['teacher_bookings'], faculty)
+        room_busy_mask(booked_venue(session), 0)
+        for room in room_names(booked_venue(session)):
+            resources.append(('room', room))
+            resource_masks[('room', room)] = room_schedule[room]
+        if faculty != TBA_FACULTY_ID:
+            faculty_busy_mask(faculty, 0)
+            resources.append(('faculty', faculty))
+            resource_masks[('faculty', faculty)] = faculty_schedule[faculty]
+        variables.append({'kind': session['type'], 'code': session['code'],
+                          'blocks': session['blocks'], 'resources': resources})
+    
+    with instrumentation.phase('solve_csp'):
+        placements, failures = solve_sessions(
+            variables, resource_masks, len(WEEKDAYS), len(TIME_PERIODS),
+            rest_period_mask(schedule['dept'], schedule['sem'], schedule['section']),
+            near_rest_period_mask(schedule['dept'], schedule['sem'], schedule['section']),
+            rng, course_starts=schedule['grid'].course_starts,
+            course_elsewhere={code_id: [course_elsewhere_mask(schedule, code_id, day_idx)
+                                        for day_idx in range(len(WEEKDAYS))]
+                              for code_id in {session['code'] for session in sessions}}
+        )
+    for session, placement in zip(sessions, placements):
+        if placement is not None:
+            book_session(schedule, session, *placement)
+    return [(sessions[index], reason) for index, reason in failures]
+
+# Available scheduling engines, selectable with --engine
+SCHEDULER_ENGINES = {
+    'random': schedule_sessions_random,
+    'csp': schedule_sessions_csp,
+}
+
+def course_record(row):
+    """Typed record of one course row; hours are already integers in the normalized table"""
+    lab_room = row['Lab_room']
+    return {
+        'code': str(row['Course Code']),
+        'name': str(row['Course Name']),
+        'faculty': str(row['Faculty']),
+        'classroom': str(row['Classroom']),
+        'lab_room': None if is_missing(lab_room) else str(lab_room),
+        'L': row['L'], 'T': row['T'], 'P': row['P'],
+        'hours': tuple(row[column] for column in HOUR_COLUMNS),
+    }
+
+def group_course_rows(data_frame):
+    """Yield (dept, term, raw rows, course records, LTPSC legend) per group, grouping the table once in sheet order"""
+    column_names = list(data_frame.columns)
+    columns = [data_frame[name].tolist() for name in column_names]
+    positions = data_frame.groupby(['Department', 'Semester'], sort=False).indices
+    terms_by_dept = {}
+    for (dept, term), row_positions in sorted(positions.items(), key=lambda item: item[1][0]):
+        terms_by_dept.setdefault(dept, []).append((term, row_positions))
+    
+    for dept, terms in terms_by_dept.items():
+        for term, row_positions in sorted(terms, key=lambda item: str(item[0])):
+            rows = [tuple(column[position] for column in columns) for position in row_positions]
+            courses, legend = [], {}
+            for row in rows:
+                row = dict(zip(column_names, row))
+                course = course_record(row)
+                courses.append(course)
+                if not is_missing(row['Course Code']) and course['code'] not in legend:
+                    legend[course['code']] = course['hours']
+            yield dept, term, rows, courses, legend
+
+def plan_section_groups(data_frame, seed=None):
+    """Split the course table into (dept, term) groups with session requests, colors and a per-group random stream"""
+    groups = []
+    for dept, term, rows, courses, legend in group_course_rows(data_frame):
+        # Extract numeric semester and section if present
+        term_str = str(term)
+        numeric_sem = ''.join(filter(str.isdigit, term_str))
+        section = term_str[-1].upper() if term_str[-1].isalpha() else None
         
-        # Check basic availability
-        for i in range(num_blocks):
-            current_period = start_period + i
-            if (current_period in teacher_bookings[instructor][day_idx] or
-                current_period in room_bookings[venue][day_idx] or
-                schedule_grid[day_idx][current_period]['type'] is not None or
-                is_rest_period(TIME_PERIODS[current_period], dept, sem, section) or
-                is_course_scheduled_simultaneously(schedule_grid, current_period, code_id) or
-                not is_faculty_available(instructor, day_idx, start_period, num_blocks)):
-                is_available = False
-                conflicts += 1
-                break
+        rng = random.Random(f"{seed}:{dept}:{term_str}") if seed is not None else None
         
-        # Check minimum gap requirement
-        if is_available and not has_minimum_gap(schedule_grid, day_idx, start_period, code_id):
-            is_available = False
-            conflicts += 2
+        # Dictionary to store course colors
+        subject_colors = {}
+        color_generator = create_course_color(rng or random)
+        sessions = build_session_requests(courses, subject_colors, color_generator)
         
-        # For lectures, prioritize slots near breaks
-        if is_available and session_type == 'LEC':
-            # Check if any slot in the block is near a break
-            for i in range(num_blocks):
-                if is_near_break(start_period + i, dept, sem, section):
-                    break_proximity += 1
-            
-            # If this slot has better break proximity or same proximity but fewer conflicts
-            if (break_proximity > max_break_proximity or 
-                (break_proximity == max_break_proximity and conflicts < min_conflicts)):
-                best_slot = start_period
-                min_conflicts = conflicts
-                max_break_proximity = break_proximity
-        elif is_available and conflicts < min_conflicts:
-            best_slot = start_period
-            min_conflicts = conflicts
-            
-        if min_conflicts == 0 and max_break_proximity > 0:  # Found perfect slot near break
-            break
-    
-    return best_slot
-
-def generate_all_schedules():
-    # Initialize faculty schedules at the start
+        groups.append({
+            'dept': dept,
+            'term': term_str,
+            'sem': numeric_sem,
+            'section': section,
+            'legend': legend,
+            'subject_colors': subject_colors,
+            'sessions': sessions,
+            'rng': rng,
+            'rows': rows_fingerprint(rows),
+            'rest_mask': rest_period_mask(dept, numeric_sem, section),
+        })
+    return groups
+
+def check_capacity(groups):
+    """Report faculty, rooms and sections needing more periods than they have; returns the number of problems found"""
+    demands = []
+    for group in groups:
+        section_label = f"{group['dept']} {group['term']}"
+        for session in group['sessions']:
+            resources = [('section', section_label)]
+            if session['faculty_id'] != TBA_FACULTY_ID:
+                resources.append(('faculty', FACULTY_NAMES[session['faculty_id']]))
+            resources.extend(('room', room) for room in room_names(booked_venue(session)))
+            demands.append({'blocks': session['blocks'], 'rest_mask': group['rest_mask'], 'resources': resources,
+                            'label': f"{session['code']} {session['type']} for {section_label}"})
+    overloaded, impossible, load = analyze_capacity(demands, len(WEEKDAYS), len(TIME_PERIODS))
+    
+    for kind, name, required, capacity in overloaded:
+        print(f"Capacity problem: {kind} {name} needs {required} periods a week but only {capacity} are available")
+    for label in impossible:
+        print(f"Capacity problem: {label} is longer than every free stretch of its section's day")
+    if load:
+        (kind, name), (required, capacity) = max(load.items(), key=lambda item: item[1][0] / max(item[1][1], 1))
+        print(f"Capacity check: {len(overloaded) + len(impossible)} problem(s); busiest is {kind} {name} "
+              f"with {required} of {capacity} periods")
+    return len(overloaded) + len(impossible)
+
+def check_inputs():
+    """Load the course sheet, plan every group and run only the capacity check; returns the problem count"""
+    data_frame = load_course_table()
     initialize_faculty_schedule()
+    initialize_room_schedule(data_frame)
     initialize_time_periods()
+    return check_capacity(plan_section_groups(data_frame))
+
+def group_resources(group):
+    """Run-wide resources a group's sessions may read or book: ('faculty', ID), ('room', name), ('course', code)"""
+    resources = {('faculty', session['faculty_id']) for session in group['sessions']}
+    resources.discard(('faculty', TBA_FACULTY_ID))
+    for session in group['sessions']:
+        resources.update(('room', room) for room in room_names(booked_venue(session)))
+        if is_shared_course(session['code']):
+            resources.add(('course', session['code']))
+    return sorted(resources)
+
+def solve_section_group(group, engine):
+    """Schedule one group against the current faculty and room schedules; returns (schedule, conflicts)"""
+    instrumentation.set_group(group['dept'], group['term'])
+    # Teacher bookings are reset for each semester; faculty_schedule and room_schedule stay global
+    schedule = new_section_schedule(group['dept'], group['sem'], group['section'])
+    # Copy the seeded stream so a re-solve replays exactly the same draws
+    rng = copy.deepcopy(group['rng']) if group['rng'] is not None else random
+    conflicts = SCHEDULER_ENGINES[engine](schedule, group['sessions'], rng)
+    return schedule, conflicts
+
+def initialize_worker(lecture_scoring, profile=False):
+    """Process-pool initializer: rebuild module state a spawned worker does not inherit"""
+    global LECTURE_SCORING
+    LECTURE_SCORING = lecture_scoring
+    instrumentation.enable(profile)
+    initialize_time_periods()
+
+def solve_group_in_worker(group, engine, resource_snapshot):
+    """Process-pool entry point: solve a group against a snapshot of the faculty and rooms it reads"""
+    for shared in SHARED_SCHEDULES.values():
+        shared.clear()
+    for (kind, name), day_masks in resource_snapshot.items():
+        SHARED_SCHEDULES[kind][name] = list(day_masks)
+    instrumentation.reset()
+    schedule, conflicts = solve_section_group(group, engine)
+    recorded = instrumentation.snapshot() if instrumentation.enabled else None
+    return (schedule, conflicts, {(kind, name): SHARED_SCHEDULES[kind][name] for kind, name in resource_snapshot},
+            recorded)
+
+def solve_section_groups(groups, engine, jobs=1):
+    """Solve every group, sequentially or in a process pool ordered by their shared resources, with identical results"""
+    if jobs <= 1 or len(groups) <= 1:
+        return [solve_section_group(group, engine) for group in groups]
+    
+    resources = [group_resources(group) for group in groups]
+    # Conflict graph: a group waits for the latest earlier group claiming each of its resources
+    waiting_on = [set() for _ in groups]
+    dependents = [[] for _ in groups]
+    last_claim = {}
+    for index, keys in enumerate(resources):
+        for key in keys:
+            earlier = last_claim.get(key)
+            if earlier is not None and earlier not in waiting_on[index]:
+                waiting_on[index].add(earlier)
+                dependents[earlier].append(index)
+            last_claim[key] = index
+    
+    results = [None] * len(groups)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initialize_worker,
+                             initargs=(LECTURE_SCORING, instrumentation.enabled)) as pool:
+        def dispatch(index):
+            snapshot = {(kind, name): list(SHARED_SCHEDULES[kind].get(name) or new_day_masks(len(WEEKDAYS)))
+                        for kind, name in resources[index]}
+            return pool.submit(solve_group_in_worker, groups[index], engine, snapshot)
+        
+        running = {dispatch(index): index for index in range(len(groups)) if not waiting_on[index]}
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=running.get):
+                index = running.pop(future)
+                schedule, conflicts, resources_after, recorded = future.result()
+                for (kind, name), day_masks in resources_after.items():
+                    SHARED_SCHEDULES[kind][name] = day_masks
+                if recorded is not None:
+                    instrumentation.merge(recorded)
+                results[index] = (schedule, conflicts)
+                for later in dependents[index]:
+                    waiting_on[later].discard(index)
+                    if not waiting_on[later]:
+                        running[dispatch(later)] = later
+    return results
+
+def placement_fits(schedule, session, day_idx, start_period):
+    """Check a previous placement against the bookings made so far in this run"""
+    if start_period + session['blocks'] > len(TIME_PERIODS):
+        return False
+    busy = (booking_masks(schedule['teacher_bookings'], session['faculty_id'])[day_idx] |
+            room_busy_mask(booked_venue(session), day_idx) |
+            schedule['grid'].busy[day_idx] |
+            faculty_busy_mask(session['faculty_id'], day_idx) |
+            course_elsewhere_mask(schedule, session['code'], day_idx))
+    return not busy & block_mask(start_period, session['blocks'])
+
+def solve_section_groups_incremental(groups, engine, previous_state):
+    """Keep every previous placement that still fits, re-solve new, changed or colliding sessions and set group['rerender']"""
+    previous_groups = previous_state['groups']
+    schedules, pending = [], []
+    for group in groups:
+        schedule = new_section_schedule(group['dept'], group['sem'], group['section'])
+        sessions = group['sessions']
+        previous = previous_groups.get(group_key(group))
+        
+        if previous is None or previous['rest_mask'] != group['rest_mask']:
+            dirty = list(range(len(sessions)))
+            colors_changed = True
+        else:
+            kept, dirty = match_sessions(previous['placements'], sessions)
+            for index, day_idx, start_period in kept:
+                if placement_fits(schedule, sessions[index], day_idx, start_period):
+                    book_session(schedule, sessions[index], day_idx, start_period)
+                else:
+                    dirty.append(index)
+            dirty.sort()
+            colors_changed = reuse_course_colors(group['subject_colors'], previous['colors'],
+                                                 create_course_color(group['rng'] or random))
+        
+        group['rerender'] = previous is None or colors_changed or previous['rows'] != group['rows']
+        schedules.append(schedule)
+        pending.append([sessions[index] for index in dirty])
+    
+    results = []
+    for group, schedule, dirty in zip(groups, schedules, pending):
+        conflicts = []
+        instrumentation.set_group(group['dept'], group['term'])
+        if dirty:
+            rng = copy.deepcopy(group['rng']) if group['rng'] is not None else random
+            conflicts = SCHEDULER_ENGINES[engine](schedule, dirty, rng)
+            print(f"Re-solved {len(dirty)} of {len(group['sessions'])} sessions for {group['dept']} - Semester {group['sem']}"
+                  f"{' - Section ' + group['section'] if group['section'] else ''}")
+        
+        # Sessions that failed again, or were re-placed where they were, leave the page as it was
+        if not group['rerender']:
+            previous = previous_groups[group_key(group)]
+            group['rerender'] = placement_signature(schedule['grid'].placements) != placement_signature(previous['placements'])
+        results.append((schedule, conflicts))
+    return results
+
+# Penalty per occurrence in the timetable quality score (lower is better)
+QUALITY_WEIGHTS = {
+    'unplaced': 100,        # session that could not be scheduled
+    'course_clashes': 100,  # session held while another section has the same course
+    'gap_violations': 10,   # two sessions of a course on one day closer than the minimum gap
+    'back_to_back': 2,      # faculty member going straight from one session into another
+    'far_from_break': 1,    # lecture block not touching a near-break period
+}
+
+def timetable_quality(groups, results, min_gap=6):
+    """Penalty counts and weighted score of a solved timetable; a lower score is better"""
+    counts = dict.fromkeys(QUALITY_WEIGHTS, 0)
+    faculty_blocks = {}
+    course_held = {}
+    for group, (schedule, conflicts) in zip(groups, results):
+        counts['unplaced'] += len(conflicts)
+        near_mask = near_rest_period_mask(group['dept'], group['sem'], group['section'])
+        course_days = {}
+        for session, day_idx, start_period in schedule['grid'].placements:
+            block = block_mask(start_period, session['blocks'])
+            if block & course_held.get((session['code'], day_idx), 0):
+                counts['course_clashes'] += 1
+            if session['type'] == 'LEC' and not block & near_mask:
+                counts['far_from_break'] += 1
+            course_days.setdefault((session['code'], day_idx), []).append(start_period)
+            if session['faculty_id'] != TBA_FACULTY_ID:
+                faculty_blocks.setdefault((session['faculty_id'], day_idx), []).append(
+                    (start_period, start_period + session['blocks']))
+        for starts in course_days.values():
+            starts.sort()
+            counts['gap_violations'] += sum(1 for first, second in zip(starts, starts[1:]) if second - first <= min_gap)
+        for session, day_idx, start_period in schedule['grid'].placements:
+            if is_shared_course(session['code']):
+                key = (session['code'], day_idx)
+                course_held[key] = course_held.get(key, 0) | block_mask(start_period, session['blocks'])
+    for blocks in faculty_blocks.values():
+        blocks.sort()
+        counts['back_to_back'] += sum(1 for (_, end), (start, _) in zip(blocks, blocks[1:]) if start == end)
+    counts['score'] = sum(QUALITY_WEIGHTS[name] * counts[name] for name in QUALITY_WEIGHTS)
+    return counts
+
+def score_attempt(engine, seed, scoring):
+    """Process-pool entry point: solve the whole timetable with one seed and score it"""
+    global LECTURE_SCORING
+    LECTURE_SCORING = scoring
+    data_frame = load_course_table()
+    initialize_faculty_schedule()
+    initialize_room_schedule(data_frame)
+    initialize_time_periods()
+    groups = plan_section_groups(data_frame, seed)
+    results = solve_section_groups(groups, engine)
+    return timetable_quality(groups, results)
+
+def choose_best_seed(engine, seed, attempts, jobs, scoring):
+    """Solve and score one timetable per seed (seed, seed + 1, ...) in parallel and return the best seed"""
+    seeds = [seed + attempt for attempt in range(attempts)]
+    workers = min(attempts, jobs if jobs > 1 else os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        qualities = list(pool.map(score_attempt, [engine] * attempts, seeds, [scoring] * attempts))
+    
+    print(f"{'Seed':>12}" + ''.join(f"{name:>16}" for name in QUALITY_WEIGHTS) + f"{'score':>10}")
+    for attempt_seed, quality in zip(seeds, qualities):
+        print(f"{attempt_seed:>12}" + ''.join(f"{quality[name]:>16}" for name in QUALITY_WEIGHTS) +
+              f"{quality['score']:>10}")
+    best_seed, best_quality = min(zip(seeds, qualities), key=lambda item: item[1]['score'])
+    print(f"Best of {attempts} attempts: seed {best_seed} (score {best_quality['score']}); "
+          f"rerun with --seed {best_seed} to reproduce it")
+    return best_seed
+
+def optimize_timetable(groups, results, time_budget, max_moves=None, seed=None):
+    """Local-search post-pass lowering the quality score of a solved timetable; returns new (schedule, conflicts) results"""
+    items, sessions, reasons = [], [], {}
+    for group_idx, (group, (schedule, conflicts)) in enumerate(zip(groups, results)):
+        near_mask = near_rest_period_mask(group['dept'], group['sem'], group['section'])
+        entries = [(session, (day_idx, start_period)) for session, day_idx, start_period in schedule['grid'].placements]
+        for session, reason in conflicts:
+            reasons[len(items) + len(entries)] = reason
+            entries.append((session, None))
+        for session, pos in entries:
+            # TBA stands in for different people, so it only blocks within its own section
+            if session['faculty_id'] == TBA_FACULTY_ID:
+                resources = [('section', group_idx), ('teacher', group_idx, TBA_FACULTY_ID)]
+            else:
+                resources = [('section', group_idx), ('faculty', session['faculty_id'])]
+            resources.extend(('room', room) for room in room_names(booked_venue(session)))
+            if is_shared_course(session['code']):
+                # Sections may not hold the same course at the same time
+                resources.append(('course', session['code']))
+            items.append({'kind': session['type'], 'code': session['code'], 'blocks': session['blocks'],
+                          'resources': resources, 'group': group_idx,
+                          'faculty': None if session['faculty_id'] == TBA_FACULTY_ID else session['faculty_id'],
+                          'rest_mask': group['rest_mask'], 'near_mask': near_mask, 'pos': pos})
+            sessions.append(session)
+    
+    rng = random.Random(f"{seed}:optimize") if seed is not None else random.Random()
+    positions, stats = improve_placements(items, len(WEEKDAYS), len(TIME_PERIODS), QUALITY_WEIGHTS, rng,
+                                          time_budget, max_moves)
+    print(f"Local search: score {stats['initial_cost']} -> {stats['final_cost']} "
+          f"({stats['accepted']} of {stats['moves']} moves accepted in {stats['seconds']}s)")
+    
+    for shared in SHARED_SCHEDULES.values():
+        for name in shared:
+            shared[name] = new_day_masks(len(WEEKDAYS))
+    optimized = []
+    for group_idx, group in enumerate(groups):
+        schedule = new_section_schedule(group['dept'], group['sem'], group['section'])
+        conflicts = []
+        for index, item in enumerate(items):
+            if item['group'] != group_idx:
+                continue
+            if positions[index] is None:
+                conflicts.append((sessions[index], reasons.get(index, "no free slot found by local search")))
+            else:
+                book_session(schedule, sessions[index], *positions[index])
+        if placement_signature(schedule['grid'].placements) != placement_signature(results[group_idx][0]['grid'].placements):
+            group['rerender'] = True
+        optimized.append((schedule, conflicts))
+    return optimized
+
+def format_time(t):
+    """12-hour clock label with AM/PM used in timetable headers"""
+    return t.strftime("%I:%M %p")
+
+@lru_cache(maxsize=None)
+def break_colspans(rest_mask):
+    """Colspan of a break cell starting at each break period of a profile (to the end of its run)"""
+    return {start + offset: length - offset for start, length in mask_runs(rest_mask) for offset in range(length)}
+
+def section_row_cells(schedule_grid, day_idx, rest_mask):
+    """Cells of one day row: merged break periods, merged session blocks and empty periods"""
+    break_runs = break_colspans(rest_mask)
+    cells = []
+    period_idx = 0
+    while period_idx < len(TIME_PERIODS):
+        if period_idx in break_runs:
+            cells.append({'kind': 'break', 'colspan': break_runs[period_idx]})
+            period_idx += break_runs[period_idx]
+        elif schedule_grid.cell(day_idx, period_idx) and schedule_grid.is_block_start(day_idx, period_idx):
+            session = schedule_grid.cell(day_idx, period_idx)
+            cells.append({'kind': 'session', 'colspan': session['blocks'], 'session': session})
+            period_idx += session['blocks']
+        else:
+            cells.append({'kind': 'empty', 'colspan': 1})
+            period_idx += 1
+    return cells
+
+def build_section_model(group, schedule, conflicts):
+    """Solved timetable of one section as plain data, shared by the HTML and Excel writers"""
+    dept, numeric_sem, section = group['dept'], group['sem'], group['section']
+    subject_colors = group['subject_colors']
+    rest_mask = group['rest_mask']
+    
+    days = []
+    for day_idx, weekday in enumerate(WEEKDAYS):
+        cells = section_row_cells(schedule['grid'], day_idx, rest_mask)
+        for cell in cells:
+            if cell['kind'] == 'session':
+                cell['color'] = subject_colors.get(cell['session']['code'], {}).get('color', 'ffffff')
+        days.append({'name': weekday, 'cells': cells})
+    
+    safe_dept = dept.replace(' ', '_').lower()
+    return {
+        'dept': dept,
+        'term': group['term'],
+        'sem': numeric_sem,
+        'section': section,
+        'title': f'{dept} Department - Semester {numeric_sem}{" - Section " + section if section else ""}',
+        'filename': f'timetable_{safe_dept}_semester_{numeric_sem}{"_section_" + section.lower() if section else ""}.html',
+        'periods': [(format_time(begin), format_time(end)) for begin, end in TIME_PERIODS],
+        'days': days,
+        'courses': [{'code': code_id, 'color': details['color'], 'name': details['name'],
+                     'faculty': details['faculty'], 'hours': group['legend'].get(code_id)}
+                    for code_id, details in subject_colors.items()],
+        'placements': list(schedule['grid'].placements),
+        'conflicts': conflicts,
+    }
+
+def build_resource_indexes(model):
+    """Faculty ID -> and room -> [(section label, course, session, day, start)] from the committed placements of the model"""
+    by_faculty, by_room = {}, {}
+    for section_model in model:
+        label = f"{section_model['dept']} {section_model['term']}"
+        courses = {course['code']: course for course in section_model['courses']}
+        for session, day_idx, start_period in section_model['placements']:
+            entry = (label, courses.get(session['code']), session, day_idx, start_period)
+            if session['faculty_id'] != TBA_FACULTY_ID:
+                by_faculty.setdefault(session['faculty_id'], []).append(entry)
+            for room in room_names(booked_venue(session)):
+                by_room.setdefault(room, []).append(entry)
+    return by_faculty, by_room
+
+def unique_name(name, used, limit=None):
+    """A name cut to the limit, with a numeric suffix if it is already taken"""
+    candidate = name[:limit] if limit else name
+    suffix = 2
+    while candidate.lower() in used:
+        tail = f"_{suffix}"
+        candidate = (name[:limit - len(tail)] if limit else name) + tail
+        suffix += 1
+    used.add(candidate.lower())
+    return candidate
+
+def build_view_model(kind, name, entries, filename, sheet_name):
+    """Week of one faculty member or room as a section-style model for the HTML and Excel writers"""
+    grid = ScheduleGrid(len(WEEKDAYS), len(TIME_PERIODS))
+    legend = {}
+    for label, course, session, day_idx, start_period in entries:
+        # The third line of a cell names the section (and, for rooms, who teaches)
+        detail = label if kind == 'faculty' else f"{label}: {session['faculty']}"
+        color = course['color'] if course else 'ffffff'
+        grid.place(dict(session, faculty=detail, color=color), day_idx, start_period)
+        if course and course['code'] not in legend:
+            legend[course['code']] = course
+    
+    days = []
+    for day_idx, weekday in enumerate(WEEKDAYS):
+        cells = section_row_cells(grid, day_idx, 0)
+        for cell in cells:
+            if cell['kind'] == 'session':
+                cell['color'] = cell['session']['color']
+        days.append({'name': weekday, 'cells': cells})
+    
+    return {
+        'kind': kind,
+        'name': name,
+        'title': f"{name} - Faculty Timetable" if kind == 'faculty' else f"Room {name} Timetable",
+        'filename': filename,
+        'sheet_name': sheet_name,
+        'periods': [(format_time(begin), format_time(end)) for begin, end in TIME_PERIODS],
+        'days': days,
+        'courses': list(legend.values()),
+        'placements': list(grid.placements),
+        'conflicts': [],
+    }
+
+def build_view_models(model):
+    """Per-faculty and per-room timetable models, faculty first, each sorted by name"""
+    by_faculty, by_room = build_resource_indexes(model)
+    views = []
+    for kind, index, names in (('faculty', by_faculty, FACULTY_NAMES), ('room', by_room, None)):
+        used_files, used_sheets = set(), set()
+        for key, entries in sorted(index.items(), key=lambda item: names[item[0]] if names else item[0]):
+            name = names[key] if names else key
+            slug = re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_') or kind
+            filename = unique_name(f"{kind}_{slug}", used_files) + '.html'
+            sheet_name = unique_name(re.sub(r'[\\/*?:\[\]]', '_', name), used_sheets, limit=31)
+            views.append(build_view_model(kind, name, entries, filename, sheet_name))
+    return views
+
+def publish_timetables(model, departments, html_dir, rerender=None, views=False):
+    """Render and write the section pages flagged in rerender (all by default), the index and any views; returns the view models"""
+    # Track all generated timetables
+    timetable_index = {dept: [] for dept in departments}
+    generated = datetime.now().strftime("%d-%m-%Y %I:%M %p")
+    page_writer = PageWriter()
+    
+    for section_idx, section_model in enumerate(model):
+        dept, numeric_sem, section = section_model['dept'], section_model['sem'], section_model['section']
+        
+        for session, reason in section_model['conflicts']:
+            print(f"Could not schedule {session['code']} {session['type']} for {dept} - Semester {numeric_sem}"
+                  f"{' - Section ' + section if section else ''}: {reason}")
+        
+        filename = section_model['filename']
+        filepath = os.path.join(html_dir, filename)
+        timetable_index[dept].append((numeric_sem, section, filename))  # Keep original filename for links
+        
+        # Incremental runs leave the published page of an untouched section alone
+        if rerender is not None and not rerender[section_idx] and os.path.exists(filepath):
+            print(f"Timetable for {dept} - Semester {numeric_sem}{' - Section ' + section if section else ''} is unchanged")
+            continue
+        
+        # Save semester-specific HTML file with updated path; identical content is left in place
+        instrumentation.set_group(dept, section_model['term'])
+        with instrumentation.phase('render'):
+            page = render_section(section_model, generated)
+        with instrumentation.phase('write'):
+            written = page_writer.write(filepath, page)
+        if written:
+            print(f"Timetable for {dept} - Semester {numeric_sem}{' - Section ' + section if section else ''} has been saved to {filepath}")
+    
+    # Faculty and room pages, plus one index page per kind
+    view_models = []
+    if views:
+        with instrumentation.phase('views', group=''):
+            view_models = build_view_models(model)
+            for kind, heading in (('faculty', 'Faculty'), ('room', 'Rooms')):
+                links = []
+                for view_model in view_models:
+                    if view_model['kind'] == kind:
+                        page_writer.write(os.path.join(html_dir, view_model['filename']),
+                                          render_section(view_model, generated))
+                        links.append((view_model['name'], view_model['filename']))
+                page_writer.write(os.path.join(html_dir, f'{kind}_index.html'), render_link_index(heading, links))
+        print(f"{len(view_models)} faculty and room timetables generated in {html_dir}")
+    
+    # Generate index page in html directory
+    index_path = os.path.join(html_dir, 'index.html')
+    with instrumentation.phase('write_index', group=''):
+        written = page_writer.write(index_path, render_index(timetable_index))
+        page_writer.save()
+    if written:
+        print(f"Main index page generated as {index_path}")
+    page_writer.report()
+    return view_models
+
+def export_timetables(model, view_models, output_dir, excel='combined', jobs=1):
+    """Write the Excel workbooks of a solved model: sections combined or per department, plus any views"""
+    # Imported here so openpyxl is only needed when a workbook is requested
+    from export_to_excel import export_model_to_excel, write_workbook
+    excel_path = os.path.join(output_dir, 'excel', 'all_timetables.xlsx')
+    with instrumentation.phase('excel', group=''):
+        export_model_to_excel(model, excel_path, by_department=excel == 'department', jobs=jobs)
+        for kind in ('faculty', 'room') if view_models else ():
+            view_path = os.path.join(output_dir, 'excel', f'{kind}_timetables.xlsx')
+            write_workbook([view_model for view_model in view_models if view_model['kind'] == kind], view_path)
+            print(f"{kind.capitalize()} timetables have been saved to {view_path}")
+
+def save_timetable_model(groups, results, departments, engine, seed, path=MODEL_PATH):
+    """Save the solved timetable (sessions, course colors, legends, break profiles) for render-only runs"""
+    header = {
+        'engine': engine,
+        'seed': seed,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'weekdays': WEEKDAYS,
+        'time_periods': [[begin.isoformat(), end.isoformat()] for begin, end in TIME_PERIODS],
+        'faculty_names': FACULTY_NAMES,
+        'departments': departments,
+        'sections': [{
+            'dept': group['dept'], 'term': group['term'], 'sem': group['sem'], 'section': group['section'],
+            'rest_mask': group['rest_mask'],
+            'colors': [[code_id, details['color'], details['name'], details['faculty']]
+                       for code_id, details in group['subject_colors'].items()],
+            'legend': [[code_id, list(hours)] for code_id, hours in group['legend'].items()],
+        } for group in groups],
+    }
+    
+    def sessions():
+        for section_idx, (schedule, conflicts) in enumerate(results):
+            for session, day_idx, start_period in schedule['grid'].placements:
+                yield section_idx, session, day_idx, start_period, None
+            for session, reason in conflicts:
+                yield section_idx, session, None, None, reason
+    
+    return save_model(path, header, sessions(), optional=True)
+
+def load_timetable_model(path=MODEL_PATH, use_mmap=False):
+    """Section models and departments of the last solved timetable, rebuilt from its saved file without solving"""
+    initialize_time_periods()
+    header, sessions = load_model(path, use_mmap)
+    if header['time_periods'] != [[begin.isoformat(), end.isoformat()] for begin, end in TIME_PERIODS]:
+        raise ModelFormatError("the saved timetable uses other time periods; run the scheduler again")
+    
+    del FACULTY_NAMES[:]
+    FACULTY_NAMES.extend(header['faculty_names'])
+    FACULTY_IDS.clear()
+    FACULTY_IDS.update((name, faculty) for faculty, name in enumerate(FACULTY_NAMES))
+    
+    groups, results = [], []
+    for section in header['sections']:
+        groups.append(dict(section,
+                           subject_colors={code_id: {'color': color, 'name': name, 'faculty': faculty}
+                                           for code_id, color, name, faculty in section['colors']},
+                           legend={code_id: tuple(hours) for code_id, hours in section['legend']}))
+        results.append((new_section_schedule(section['dept'], section['sem'], section['section']), []))
+    for section_idx, session, day_idx, start_period, reason in sessions:
+        schedule, conflicts = results[section_idx]
+        if day_idx is None:
+            conflicts.append((session, reason))
+        else:
+            schedule['grid'].place(session, day_idx, start_period)
+    
+    model = [build_section_model(group, schedule, conflicts) for group, (schedule, conflicts) in zip(groups, results)]
+    return model, header['departments']
+
+def render_saved_timetables(views=False, use_mmap=False):
+    """Re-render every page from the saved timetable, e.g. after editing the templates; no scheduling"""
+    start = datetime.now()
+    model, departments = load_timetable_model(use_mmap=use_mmap)
+    print(f"Loaded {len(model)} saved timetables in {(datetime.now() - start).total_seconds() * 1000:.0f} ms")
+    output_dir = os.path.join(os.path.dirname(__file__), 'output')
+    html_dir = os.path.join(output_dir, 'html')
+    os.makedirs(html_dir, exist_ok=True)
+    publish_timetables(model, departments, html_dir, views=views)
+    return model
+
+def export_saved_timetables(excel='combined', views=False, jobs=1, use_mmap=False):
+    """Write the Excel workbooks from the saved timetable; no scheduling"""
+    model, _ = load_timetable_model(use_mmap=use_mmap)
+    export_timetables(model, build_view_models(model) if views else [], os.path.join(os.path.dirname(__file__), 'output'),
+                      excel, jobs)
+    return model
+
+def generate_all_schedules(engine='random', seed=None, jobs=1, incremental=False, scoring='bitmask', excel=False,
+                           attempts=1, optimize=0, optimize_moves=None, views=False, strict=False):
+    """Solve, render and save every timetable; returns the solved model (one dict per section)"""
+    global LECTURE_SCORING
+    LECTURE_SCORING = scoring
+    
+    instrumentation.reset()
+    
+    # Load data from Excel (read once, shared with the faculty initialization)
+    with instrumentation.phase('load', group=''):
+        try:
+            data_frame = load_course_table()
+        except FileNotFoundError:
+            print("Error: File 'combined2.xlsx' not found in the current directory")
+            sys.exit(1)
+        
+        # Initialize faculty and room schedules at the start
+        initialize_faculty_schedule()
+        initialize_room_schedule(data_frame)
+        initialize_time_periods()
     
     # Create output directories
     output_dir = os.path.join(os.path.dirname(__file__), 'output')
@@ -287,380 +1193,136 @@ def generate_all_schedules():
         """Check if there's already a lecture of the same course in adjacent time slots"""
         # Check previous time slot
         if start_period > 0:
-            prev_slot = schedule_grid[day_idx][start_period-1]
-            if prev_slot['type'] == 'LEC' and prev_slot['code'] == code_id:
+            prev_slot = schedule_grid.cell(day_idx, start_period-1)
+            if (prev_slot and prev_slot['type'] == 'LEC' and prev_slot['code'] == code_id and
+                    schedule_grid.is_block_start(day_idx, start_period-1)):
                 return True
                 
         # Check next time slot after the lecture block
         if start_period + LECTURE_BLOCKS < len(TIME_PERIODS):
-            next_slot = schedule_grid[day_idx][start_period + LECTURE_BLOCKS]
-            if next_slot['type'] == 'LEC' and next_slot['code'] == code_id:
+            next_slot = schedule_grid.cell(day_idx, start_period + LECTURE_BLOCKS)
+            if (next_slot and next_slot['type'] == 'LEC' and next_slot['code'] == code_id and
+                    schedule_grid.is_block_start(day_idx, start_period + LECTURE_BLOCKS)):
                 return True
                 
         return False
     
-    # Read both templates
-    template_dir = os.path.dirname(__file__)
-    with open(os.path.join(template_dir, 'template.html'), 'r', encoding='utf-8') as f:
-        template = f.read()
-    with open(os.path.join(template_dir, 'index_template.html'), 'r', encoding='utf-8') as f:
-        index_template = f.read()
+    if seed is None and (jobs > 1 or attempts > 1):
+        # Parallel and multi-attempt runs always use per-group streams; pick and report a seed so the run can be reproduced
+        seed = random.randrange(2**32)
+        print(f"Using seed {seed}")
+    if attempts > 1:
+        with instrumentation.phase('attempts', group=''):
+            seed = choose_best_seed(engine, seed, attempts, jobs, scoring)
     
-    # Track all generated timetables
-    timetable_index = {}
+    with instrumentation.phase('plan', group=''):
+        groups = plan_section_groups(data_frame, seed)
+    with instrumentation.phase('capacity', group=''):
+        problems = check_capacity(groups)
+    if problems and strict:
+        print(f"Not scheduling: fix the {problems} capacity problem(s) in the course sheet first")
+        sys.exit(1)
+    previous_state = load_state() if incremental else None
+    with instrumentation.phase('solve_total', group=''):
+        if previous_state and previous_state['engine'] == engine and previous_state['time_periods'] == TIME_PERIODS:
+            solved = solve_section_groups_incremental(groups, engine, previous_state)
+        else:
+            if incremental:
+                print("No compatible previous timetable state found; scheduling everything")
+            solved = solve_section_groups(groups, engine, jobs)
+    if optimize or optimize_moves:
+        with instrumentation.phase('optimize', group=''):
+            solved = optimize_timetable(groups, solved, optimize, optimize_moves, seed)
+    with instrumentation.phase('save_state', group=''):
+        save_state(groups, solved, engine, TIME_PERIODS)
     
-    # Change time format
-    time_format = lambda t: t.strftime("%I:%M %p")  # 12-hour format with AM/PM
+    quality = timetable_quality(groups, solved)
+    print("Timetable quality: " + ", ".join(f"{name} {quality[name]}" for name in QUALITY_WEIGHTS) +
+          f" (score {quality['score']})")
     
-    for dept in data_frame['Department'].unique():
-        timetable_index[dept] = []
-        # Get unique semesters including section info
-        semesters = data_frame[data_frame['Department'] == dept]['Semester'].unique()
-        
-        for term in sorted(semesters, key=str):
-            # Reset bookings for each semester
-            teacher_bookings = {}
-            room_bookings = {}
-            
-            # Filter subjects for this department/semester
-            section_subjects = data_frame[
-                (data_frame['Department'] == dept) & 
-                (data_frame['Semester'] == term)
-            ].copy()
-            
-            if section_subjects.empty:
-                continue
-                
-            # Extract numeric semester and section if present
-            term_str = str(term)
-            numeric_sem = ''.join(filter(str.isdigit, term_str))
-            section = term_str[-1].upper() if term_str[-1].isalpha() else None
-            
-            # Rest of scheduling logic
-            schedule_grid = {day_idx: {period_idx: {'type': None, 'code': '', 'name': '', 'faculty': '', 'classroom': ''} 
-                         for period_idx in range(len(TIME_PERIODS))} for day_idx in range(len(WEEKDAYS))}
-            
-            # Dictionary to store course colors
-            subject_colors = {}
-            color_generator = create_course_color()
-            
-            # First schedule all labs since they're less flexible
-            practical_subjects = section_subjects[section_subjects['P'] > 0]
-            for _, subject in practical_subjects.iterrows():
-                code_id = str(subject['Course Code'])
-                subj_name = str(subject['Course Name'])
-                instructor = str(subject['Faculty'])
-                regular_venue = str(subject['Classroom'])
-                lab_venue = str(subject['Lab_room']) if pd.notna(subject['Lab_room']) else regular_venue
-                practical_hours = int(subject['P'])
-                
-                # Assign a color to this course if not already assigned
-                if code_id not in subject_colors:
-                    subject_colors[code_id] = {"color": next(color_generator), "name": subj_name, "faculty": instructor}
-                
-                if instructor not in teacher_bookings:
-                    teacher_bookings[instructor] = {day_idx: set() for day_idx in range(len(WEEKDAYS))}
-                if lab_venue not in room_bookings:
-                    room_bookings[lab_venue] = {day_idx: set() for day_idx in range(len(WEEKDAYS))}
-                
-                # Schedule labs - regardless of P value (2 or more), schedule only one 2-hour lab session per week
-                is_scheduled = False
-                try_count = 0
-                while not is_scheduled and try_count < 1000:
-                    day_idx = random.randint(0, len(WEEKDAYS)-1)
-                    if len(TIME_PERIODS) >= LAB_BLOCKS:
-                        start_period = random.randint(0, len(TIME_PERIODS)-LAB_BLOCKS)
-                        
-                        # Check if all required slots are free and not in break time
-                        is_available = True
-                        for i in range(LAB_BLOCKS):
-                            if (start_period+i in teacher_bookings[instructor][day_idx] or 
-                                start_period+i in room_bookings[lab_venue][day_idx] or
-                                schedule_grid[day_idx][start_period+i]['type'] is not None or
-                                is_rest_period(TIME_PERIODS[start_period+i])):
-                                is_available = False
-                                break
-                        
-                        if is_available:
-                            # Mark professor and lab classroom as busy
-                            mark_faculty_busy(instructor, day_idx, start_period, LAB_BLOCKS)
-                            for i in range(LAB_BLOCKS):
-                                teacher_bookings[instructor][day_idx].add(start_period+i)
-                                room_bookings[lab_venue][day_idx].add(start_period+i)
-                                schedule_grid[day_idx][start_period+i]['type'] = 'LAB'
-                                schedule_grid[day_idx][start_period+i]['code'] = code_id if i == 0 else ''
-                                schedule_grid[day_idx][start_period+i]['name'] = subj_name if i == 0 else ''
-                                schedule_grid[day_idx][start_period+i]['faculty'] = instructor if i == 0 else ''
-                                schedule_grid[day_idx][start_period+i]['classroom'] = lab_venue if i == 0 else ''  # Use lab venue for practical sessions
-                            is_scheduled = True
-                    try_count += 1
-            
-            # Now process all subjects that have lectures or tutorials
-            theory_subjects = section_subjects[(section_subjects['L'] > 0) | (section_subjects['T'] > 0)]
-            for _, subject in theory_subjects.iterrows():
-                code_id = str(subject['Course Code'])
-                subj_name = str(subject['Course Name'])
-                instructor = str(subject['Faculty'])
-                venue = str(subject['Classroom'])
-                lecture_hours = int(subject['L']) if pd.notna(subject['L']) else 0
-                tutorial_hours = int(subject['T']) if pd.notna(subject['T']) else 0
-                
-                # For 3-hour lecture courses, schedule exactly 2 lectures of 1.5 hours each
-                # For 6-hour lecture courses, schedule exactly 4 lectures of 1.5 hours each
-                if lecture_hours == 3:
-                    num_lectures = 2
-                elif lecture_hours == 6:
-                    num_lectures = 4
-                else:
-                    num_lectures = lecture_hours
-                
-                # Assign a color to this course if not already assigned
-                if code_id not in subject_colors:
-                    subject_colors[code_id] = {"color": next(color_generator), "name": subj_name, "faculty": instructor}
-                
-                if instructor not in teacher_bookings:
-                    teacher_bookings[instructor] = {day_idx: set() for day_idx in range(len(WEEKDAYS))}
-                if venue not in room_bookings:
-                    room_bookings[venue] = {day_idx: set() for day_idx in range(len(WEEKDAYS))}
-                
-                # Schedule lectures (1.5 hours each)
-                for _ in range(num_lectures):
-                    is_scheduled = False
-                    try_count = 0
-                    while not is_scheduled and try_count < 1000:
-                        day_idx = random.randint(0, len(WEEKDAYS)-1)
-                        if len(TIME_PERIODS) >= LECTURE_BLOCKS:
-                            start_period = find_best_slot(
-                                schedule_grid, teacher_bookings, room_bookings,
-                                instructor, venue, LECTURE_BLOCKS, day_idx, code_id,
-                                dept, numeric_sem, section, 'LEC'
-                            )
-                            
-                            if start_period != -1:
-                                # Mark professor and classroom as busy
-                                mark_faculty_busy(instructor, day_idx, start_period, LECTURE_BLOCKS)
-                                for i in range(LECTURE_BLOCKS):
-                                    teacher_bookings[instructor][day_idx].add(start_period+i)
-                                    room_bookings[venue][day_idx].add(start_period+i)
-                                    schedule_grid[day_idx][start_period+i]['type'] = 'LEC'
-                                    schedule_grid[day_idx][start_period+i]['code'] = code_id if i == 0 else ''
-                                    schedule_grid[day_idx][start_period+i]['name'] = subj_name if i == 0 else ''
-                                    schedule_grid[day_idx][start_period+i]['faculty'] = instructor if i == 0 else ''
-                                    schedule_grid[day_idx][start_period+i]['classroom'] = venue if i == 0 else ''
-                                is_scheduled = True
-                        try_count += 1
-                
-                # Schedule tutorials (30 mins)
-                for _ in range(tutorial_hours):
-                    is_scheduled = False
-                    try_count = 0
-                    while not is_scheduled and try_count < 1000:
-                        day_idx = random.randint(0, len(WEEKDAYS)-1)
-                        if len(TIME_PERIODS) >= TUTORIAL_BLOCKS:
-                            start_period = random.randint(0, len(TIME_PERIODS)-TUTORIAL_BLOCKS)
-                            
-                            # Skip if it's break time
-                            if is_rest_period(TIME_PERIODS[start_period]):
-                                try_count += 1
-                                continue
-                                
-                            # Check if all required slots are free
-                            is_available = True
-                            for i in range(TUTORIAL_BLOCKS):
-                                if (start_period+i in teacher_bookings[instructor][day_idx] or 
-                                    start_period+i in room_bookings[venue][day_idx] or
-                                    schedule_grid[day_idx][start_period+i]['type'] is not None):
-                                    is_available = False
-                                    break
-                                    
-                            if is_available:
-                                # Mark professor and classroom as busy
-                                mark_faculty_busy(instructor, day_idx, start_period, TUTORIAL_BLOCKS)
-                                for i in range(TUTORIAL_BLOCKS):
-                                    teacher_bookings[instructor][day_idx].add(start_period+i)
-                                    room_bookings[venue][day_idx].add(start_period+i)
-                                    schedule_grid[day_idx][start_period+i]['type'] = 'TUT'
-                                    schedule_grid[day_idx][start_period+i]['code'] = code_id if i == 0 else ''
-                                    schedule_grid[day_idx][start_period+i]['name'] = subj_name if i == 0 else ''
-                                    schedule_grid[day_idx][start_period+i]['faculty'] = instructor if i == 0 else ''
-                                    schedule_grid[day_idx][start_period+i]['classroom'] = venue if i == 0 else ''
-                                is_scheduled = True
-                        try_count += 1
-            
-            # Generate HTML table for this department/semester/section
-            dept_content = f'''
-                <div class="timetable-header">
-                    <h2>{dept} Department - Semester {numeric_sem}{" - Section " + section if section else ""}</h2>
-                    <p class="timestamp">Generated: {datetime.now().strftime("%d-%m-%Y %I:%M %p")}</p>
-                </div>
-                <table>
-            '''
-            
-            # Add header row
-            dept_content += '<tr><th>Day</th>'
-            for period in TIME_PERIODS:
-                dept_content += f'<th>{time_format(period[0])}<br>to<br>{time_format(period[1])}</th>'
-            dept_content += '</tr>\n'
-            
-            # Add data rows with improved cell formatting
-            for day_idx, weekday in enumerate(WEEKDAYS):
-                dept_content += f'<tr><td><b>{weekday}</b></td>'
-                
-                skip_cells = 0
-                break_count = 0
-                
-                # Modified rest period check to include department info
-                def is_break_for_dept(period):
-                    return is_rest_period(period, dept, numeric_sem, section)
-                
-                for period_idx in range(len(TIME_PERIODS)):
-                    if skip_cells > 0:
-                        skip_cells -= 1
-                        continue
-                    
-                    # Count consecutive break periods
-                    if is_break_for_dept(TIME_PERIODS[period_idx]):
-                        break_count = 1
-                        next_idx = period_idx + 1
-                        while next_idx < len(TIME_PERIODS) and is_break_for_dept(TIME_PERIODS[next_idx]):
-                            break_count += 1
-                            next_idx += 1
-                        dept_content += f'<td colspan="{break_count}" class="break">BREAK</td>'
-                        skip_cells = break_count - 1
-                    elif schedule_grid[day_idx][period_idx]['type']:
-                        if schedule_grid[day_idx][period_idx]['code']:
-                            session_type = schedule_grid[day_idx][period_idx]['type']
-                            code_id = schedule_grid[day_idx][period_idx]['code']
-                            venue = schedule_grid[day_idx][period_idx]['classroom']
-                            faculty = schedule_grid[day_idx][period_idx]['faculty']
-                            color = subject_colors.get(code_id, {}).get('color', 'ffffff')
-                            
-                            if session_type == 'LEC':
-                                colspan = LECTURE_BLOCKS
-                            elif session_type == 'LAB':
-                                colspan = LAB_BLOCKS
-                            else:  # TUT
-                                colspan = TUTORIAL_BLOCKS
-                                
-                            skip_cells = colspan - 1
-                            dept_content += f'''<td colspan="{colspan}" class="timetable-cell">
-                                <div class="course-block" style="background-color: #{color}">
-                                    <strong>{code_id} {session_type}</strong><br>
-                                    Room: {venue}<br>
-                                    {faculty}
-                                </div>
-                            </td>'''
-                        else:
-                            dept_content += '<td></td>'
-                    else:
-                        dept_content += '<td></td>'
-                        
-                dept_content += '</tr>\n'
-            
-            dept_content += '</table>\n'
-            
-            # Add LTPSC Legend first
-            dept_content += '<div class="legend"><h3>LTPSC Information</h3>\n<table>\n'
-            dept_content += '<tr><th>Course Code</th><th>L</th><th>T</th><th>P</th><th>S</th><th>C</th></tr>\n'
-            
-            for code_id in subject_colors.keys():
-                course_rows = section_subjects[section_subjects['Course Code'] == code_id]
-                if course_rows.empty:
-                    continue
-                    
-                course_info = course_rows.iloc[0]
-                l_hours = int(course_info['L']) if pd.notna(course_info['L']) else 0
-                t_hours = int(course_info['T']) if pd.notna(course_info['T']) else 0
-                p_hours = int(course_info['P']) if pd.notna(course_info['P']) else 0
-                s_hours = int(course_info['S']) if pd.notna(course_info['S']) else 0
-                credits = int(course_info['C']) if pd.notna(course_info['C']) else 0
-                
-                dept_content += f'''
-                <tr>
-                    <td><strong>{code_id}</strong></td>
-                    <td>{l_hours}</td>
-                    <td>{t_hours}</td>
-                    <td>{p_hours}</td>
-                    <td>{s_hours}</td>
-                    <td>{credits}</td>
-                </tr>'''
-            
-            dept_content += '</table></div>\n'
-            
-            # Add Course Legend after LTPSC
-            dept_content += '<div class="legend"><h3>Course Legend</h3>\n<table>\n'
-            dept_content += '<tr><th>Course Code</th><th>Color</th><th>Course Name</th><th>Faculty</th></tr>\n'
-            
-            for code_id, details in subject_colors.items():
-                dept_content += f'''
-                <tr>
-                    <td><strong>{code_id}</strong></td>
-                    <td><div class="legend-color" style="background-color: #{details['color']}"></div></td>
-                    <td>{details['name']}</td>
-                    <td>{details['faculty']}</td>
-                </tr>'''
-            
-            dept_content += '</table></div>\n'
-        
-            # Save semester-specific HTML file with updated path
-            safe_dept = dept.replace(' ', '_').lower()
-            filename = f'timetable_{safe_dept}_semester_{numeric_sem}{"_section_" + section.lower() if section else ""}.html'
-            filepath = os.path.join(html_dir, filename)
-            timetable_index[dept].append((numeric_sem, section, filename))  # Keep original filename for links
-            
-            sem_html = template.replace('<!-- CONTENT_PLACEHOLDER -->', dept_content)
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(sem_html)
-            
-            print(f"Timetable for {dept} - Semester {numeric_sem}{' - Section ' + section if section else ''} has been saved to {filepath}")
-            
-            # Reset dept_content for next section
-            dept_content = ''
-    
-    # Generate index page
-    index_content = ''
-    for dept, semesters in sorted(timetable_index.items()):
-        index_content += f'''
-        <div class="dept-section">
-            <h2 class="dept-title">{dept} Department</h2>
-            <div class="semester-grid">
-        '''
-        
-        if dept == 'CSE':
-            # Group CSE by semester
-            sem_groups = {}
-            for term, section, filename in sorted(semesters):
-                if term not in sem_groups:
-                    sem_groups[term] = []
-                sem_groups[term].append((section, filename))
-            
-            for term in sorted(sem_groups.keys()):
-                index_content += f'<div class="semester-group"><h3>Semester {term}</h3>'
-                for section, filename in sorted(sem_groups[term]):
-                    index_content += f'''
-                        <a href="{filename}" class="semester-link">
-                            Section {section}
-                        </a>
-                    '''
-                index_content += '</div>'
-        else:
-            # Unchanged display for other departments
-            for term, _, filename in sorted(semesters):
-                index_content += f'''
-                    <a href="{filename}" class="semester-link">
-                        Semester {term}
-                    </a>
-                '''
-        
-        index_content += '</div></div>'
-
-    # Save index file in html directory
-    index_html = index_template.replace('<!-- CONTENT_PLACEHOLDER -->', index_content)
-    index_path = os.path.join(html_dir, 'index.html')
-    with open(index_path, 'w', encoding='utf-8') as f:
-        f.write(index_html)
+    departments = list(data_frame['Department'].unique())
+    with instrumentation.phase('build_model', group=''):
+        model = [build_section_model(group, schedule, conflicts) for group, (schedule, conflicts) in zip(groups, solved)]
+    with instrumentation.phase('save_model', group=''):
+        save_timetable_model(groups, solved, departments, engine, seed)
     
-    print(f"Main index page generated as {index_path}")
+    view_models = publish_timetables(model, departments, html_dir, [group.get('rerender', True) for group in groups],
+                                     views=views)
+    if excel:
+        export_timetables(model, view_models, output_dir, excel, jobs)
+    
+    if instrumentation.enabled:
+        instrumentation.write_report(os.path.join(output_dir, 'profile', 'run_profile.json'))
+    return model
 
 if __name__ == "__main__":
-    generate_all_schedules()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate department timetables")
+    parser.add_argument('--engine', choices=sorted(SCHEDULER_ENGINES), default='random',
+                        help="scheduling engine: 'random' retries (default) or 'csp' constraint propagation")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="seed for reproducible placements (each department/semester gets its own stream)")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="number of processes used to schedule department/semester groups")
+    parser.add_argument('--scoring', choices=['bitmask', 'numpy'], default='bitmask',
+                        help="lecture slot scoring for the random engine: per-day bitmasks or batched NumPy arrays")
+    parser.add_argument('--incremental', action='store_true',
+                        help="keep the previous run's placements and only re-solve sessions whose course rows changed")
+    parser.add_argument('--excel', nargs='?', choices=['combined', 'department'], const='combined', default=None,
+                        help="also write Excel straight from the solved timetables: one all_timetables.xlsx "
+                             "(default) or one workbook per department, written in --jobs processes")
+    parser.add_argument('--attempts', type=int, default=1,
+                        help="solve this many seeded timetables (--seed, --seed + 1, ...) on all cores, or --jobs "
+                             "processes, and keep the one with the best quality score")
+    parser.add_argument('--optimize', type=float, default=0, metavar='SECONDS',
+                        help="improve the solved timetable with a local-search pass for up to this many seconds")
+    parser.add_argument('--optimize-moves', type=int, default=None, metavar='N',
+                        help="cap the local-search pass at N moves; with --seed the pass is then reproducible")
+    parser.add_argument('--views', action='store_true',
+                        help="also write a timetable page per faculty member and per room (and Excel sheets with --excel)")
+    parser.add_argument('--render', action='store_true',
+                        help="re-render the pages of the last solved timetable without scheduling (e.g. after "
+                             "editing template.html)")
+    parser.add_argument('--export', nargs='?', choices=['combined', 'department'], const='combined', default=None,
+                        help="write the Excel workbooks of the last solved timetable without scheduling")
+    parser.add_argument('--mmap', action='store_true',
+                        help="memory-map the saved timetable when reloading it for --render or --export")
+    parser.add_argument('--check', action='store_true',
+                        help="only check faculty, room and section capacity against the course sheet; "
+                             "exit with status 1 if anything can never fit")
+    parser.add_argument('--strict', action='store_true',
+                        help="stop before scheduling, with exit status 1, if the capacity check finds problems")
+    parser.add_argument('--profile', action='store_true',
+                        help=f"count retries and slot probes and time each phase per department/semester "
+                             f"(also enabled by {instrumentation.ENV_VAR}=1); report in output/profile")
+    parser.add_argument('--cprofile', action='store_true', help="run under cProfile and save the stats to output/profile")
+    parser.add_argument('--tracemalloc', action='store_true', help="trace Python allocations and report the peak")
+    args = parser.parse_args()
+    if args.profile:
+        instrumentation.enable()
+    
+    if args.check:
+        raise SystemExit(1 if check_inputs() else 0)
+    
+    if args.render or args.export:
+        try:
+            if args.render:
+                render_saved_timetables(views=args.views, use_mmap=args.mmap)
+            if args.export:
+                export_saved_timetables(args.export, views=args.views, jobs=args.jobs, use_mmap=args.mmap)
+        except FileNotFoundError:
+            parser.error("no saved timetable found; run the scheduler first")
+        except ModelFormatError as e:
+            parser.error(str(e))
+        raise SystemExit(0)
+    
+    if args.attempts > 1 and args.incremental:
+        parser.error("--attempts solves complete timetables and cannot be combined with --incremental")
+    
+    options = dict(engine=args.engine, seed=args.seed, jobs=args.jobs, incremental=args.incremental,
+                   scoring=args.scoring, excel=args.excel, attempts=args.attempts,
+                   optimize=args.optimize, optimize_moves=args.optimize_moves, views=args.views, strict=args.strict)
+    if args.cprofile or args.tracemalloc:
+        instrumentation.run_profiled(generate_all_schedules, os.path.join(os.path.dirname(__file__), 'output', 'profile'),
+                                     use_cprofile=args.cprofile, use_tracemalloc=args.tracemalloc, **options)
+    else:
+        generate_all_schedules(**options)
\ No newline at end of file
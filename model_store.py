@@ -0,0 +1,151 @@
+"""Compact, versioned file format for a solved timetable.
+
+The file is a small JSON header followed by fixed-width numeric columns:
+
+    MAGIC | header length (uint32, little endian) | JSON header | padding | columns
+
+The header holds everything that is not a per-session number: format version,
+time period labels, weekday names, the faculty directory, an interned string
+table, and one record per section with its break profile, course colors and
+LTPSC legend. Sessions (placed and unplaced) are rows of the numeric columns,
+whose strings are indexes into the string table. Reading the columns is a
+``memoryview.cast`` over the file contents, so with ``use_mmap`` a reload
+maps the file instead of copying it.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from data_loader import CACHE_DIR, write_atomic
+
+MODEL_PATH = os.path.join(CACHE_DIR, 'timetable_model.bin')
+MAGIC = b'TTMODEL\0'
+FORMAT_VERSION = 1
+ALIGNMENT = 8
+
+# name -> array typecode of every session column
+SESSION_COLUMNS = {
+    'section': 'I',
+    'type': 'I',
+    'code': 'I',
+    'name': 'I',
+    'faculty': 'I',
+    'venue': 'I',
+    'faculty_id': 'I',
+    'blocks': 'B',
+    'day': 'b',      # -1 for a session that could not be placed
+    'start': 'b',
+    'reason': 'I',   # conflict reason for unplaced sessions
+}
+
+
+class ModelFormatError(ValueError):
+    """The file is not a timetable model this version can read"""
+
+
+def save_model(path, header, sessions, optional=False):
+    """Write a model file; returns False if ``optional`` and it could not be written.
+
+    ``header`` is a JSON-ready dict (sections, time periods, ...);
+    ``sessions`` is an iterable of ``(section_idx, session, day_idx,
+    start_period, reason)`` with ``day_idx`` None for unplaced sessions.
+    """
+    strings, string_ids = [''], {'': 0}
+
+    def intern(value):
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    columns = {name: array(typecode) for name, typecode in SESSION_COLUMNS.items()}
+    for section_idx, session, day_idx, start_period, reason in sessions:
+        columns['section'].append(section_idx)
+        for name in ('type', 'code', 'name', 'faculty', 'venue'):
+            columns[name].append(intern(session[name]))
+        columns['faculty_id'].append(session['faculty_id'])
+        columns['blocks'].append(session['blocks'])
+        columns['day'].append(-1 if day_idx is None else day_idx)
+        columns['start'].append(-1 if day_idx is None else start_period)
+        columns['reason'].append(intern(reason or ''))
+
+    layout, offset = {}, 0
+    for name, column in columns.items():
+        layout[name] = [offset, len(column)]
+        offset += len(column) * column.itemsize
+        offset += -offset % ALIGNMENT
+    header = dict(header, version=FORMAT_VERSION, byteorder=sys.byteorder, strings=strings, columns=layout)
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    prefix_length = len(MAGIC) + 4 + len(header_bytes)
+
+    parts = [MAGIC, struct.pack('<I', len(header_bytes)), header_bytes, bytes(-prefix_length % ALIGNMENT)]
+    for column in columns.values():
+        data = column.tobytes()
+        parts.append(data + bytes(-len(data) % ALIGNMENT))
+    return write_atomic(path, b''.join(parts), optional=optional)
+
+
+def load_model(path=MODEL_PATH, use_mmap=False):
+    """Read a model file; returns ``(header, sessions)`` in the shape given to ``save_model``.
+
+    Raises FileNotFoundError if there is no saved model and ModelFormatError
+    if the file is from another format version or not a model at all.
+    """
+    with open(path, 'rb') as f:
+        if use_mmap:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            data = f.read()
+    try:
+        with memoryview(data) as view:
+            return decode_model(view)
+    finally:
+        if use_mmap:
+            data.close()
+
+
+def decode_model(view):
+    """Header and session rows of a model file's contents"""
+    if bytes(view[:len(MAGIC)]) != MAGIC:
+        raise ModelFormatError("not a timetable model file")
+    (header_length,) = struct.unpack_from('<I', view, len(MAGIC))
+    header_start = len(MAGIC) + 4
+    header = json.loads(bytes(view[header_start:header_start + header_length]).decode('utf-8'))
+    if header.get('version') != FORMAT_VERSION:
+        raise ModelFormatError(f"timetable model version {header.get('version')} is not supported "
+                               f"(expected {FORMAT_VERSION})")
+
+    base = header_start + header_length
+    base += -base % ALIGNMENT
+    columns, views = {}, []
+    try:
+        for name, typecode in SESSION_COLUMNS.items():
+            offset, count = header['columns'][name]
+            size = array(typecode).itemsize
+            raw = view[base + offset:base + offset + count * size]
+            views.append(raw)
+            if header['byteorder'] == sys.byteorder:
+                columns[name] = raw.cast(typecode)
+                views.append(columns[name])
+            else:
+                columns[name] = array(typecode, raw.tobytes())
+                columns[name].byteswap()
+
+        strings = header['strings']
+        sessions = []
+        for row in range(len(columns['section'])):
+            session = {'type': strings[columns['type'][row]], 'code': strings[columns['code'][row]],
+                       'name': strings[columns['name'][row]], 'faculty': strings[columns['faculty'][row]],
+                       'faculty_id': columns['faculty_id'][row], 'venue': strings[columns['venue'][row]],
+                       'blocks': columns['blocks'][row]}
+            day_idx = columns['day'][row]
+            sessions.append((columns['section'][row], session, None if day_idx < 0 else day_idx,
+                             columns['start'][row], strings[columns['reason'][row]] or None))
+    finally:
+        # A mapped file can only be closed once no view into it is left
+        for column_view in reversed(views):
+            column_view.release()
+    return header, sessions
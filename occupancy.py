@@ -0,0 +1,65 @@
+"""Bitmask occupancy helpers for faculty, rooms and sections.
+
+Every tracked entity keeps one integer per weekday; bit ``i`` is set when
+period ``i`` of ``TIME_PERIODS`` is taken. A whole lecture, lab or tutorial
+block is then tested or committed with a single AND / OR.
+"""
+from functools import lru_cache
+
+
+def block_mask(start_period, num_blocks):
+    """Bitmask covering ``num_blocks`` consecutive periods from ``start_period``"""
+    return ((1 << num_blocks) - 1) << start_period
+
+
+def new_day_masks(num_days):
+    """Empty per-day occupancy masks"""
+    return [0] * num_days
+
+
+def free_starts(busy_mask, num_blocks, num_periods):
+    """Bitmask of start periods where a block of ``num_blocks`` fits without touching ``busy_mask``"""
+    if num_blocks > num_periods:
+        return 0
+    free = ~busy_mask & ((1 << num_periods) - 1)
+    starts = free
+    for offset in range(1, num_blocks):
+        starts &= free >> offset
+    return starts & ((1 << (num_periods - num_blocks + 1)) - 1)
+
+
+def overlapping_starts(mask, num_blocks):
+    """Bitmask of start periods whose block would overlap any bit of ``mask``"""
+    starts = mask
+    for offset in range(1, num_blocks):
+        starts |= mask >> offset
+    return starts
+
+
+def lowest_bit(mask):
+    """Index of the lowest set bit, or -1 for an empty mask"""
+    if not mask:
+        return -1
+    return (mask & -mask).bit_length() - 1
+
+
+def iter_bits(mask):
+    """Yield the indexes of all set bits in ascending order"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+@lru_cache(maxsize=None)
+def mask_runs(mask):
+    """``(start, length)`` of every run of consecutive set bits, lowest first"""
+    runs = []
+    while mask:
+        start = (mask & -mask).bit_length() - 1
+        length = 0
+        while mask >> (start + length) & 1:
+            length += 1
+        runs.append((start, length))
+        mask &= ~block_mask(start, length)
+    return tuple(runs)
@@ -0,0 +1,84 @@
+"""Change-aware writer for the generated pages.
+
+Each page is hashed with its volatile fields (the ``Generated:`` timestamp)
+blanked out and compared with the hash recorded in a manifest by the last
+run. Only pages whose content changed are rewritten, atomically, so unchanged
+files keep their bytes and mtimes and downstream caches stay warm.
+"""
+import hashlib
+import json
+import os
+import re
+
+from data_loader import CACHE_DIR, file_signature, write_atomic
+
+OUTPUT_DIR = os.path.dirname(CACHE_DIR)
+MANIFEST_PATH = os.path.join(CACHE_DIR, 'output_manifest.json')
+MANIFEST_VERSION = 1
+
+# Parts of a page that change on every run without changing its content
+VOLATILE_FIELDS = re.compile(r'Generated: [^<]*')
+
+
+def content_hash(text):
+    """SHA-256 of a page with its volatile fields blanked out"""
+    return hashlib.sha256(VOLATILE_FIELDS.sub('Generated: ', text).encode('utf-8')).hexdigest()
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """Page hashes recorded by the last run, or an empty manifest"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('files', {})
+
+
+class PageWriter:
+    """Writes pages whose content changed since the last run and records what it skipped"""
+
+    def __init__(self, manifest_path=MANIFEST_PATH):
+        self.manifest_path = manifest_path
+        self.files = load_manifest(manifest_path)
+        self.written = []
+        self.skipped = []
+
+    def key(self, target):
+        return os.path.relpath(os.path.abspath(target), OUTPUT_DIR)
+
+    def current_hash(self, target):
+        """Hash of the page on disk, trusting the manifest while its size and mtime are unchanged"""
+        if not os.path.exists(target):
+            return None
+        entry = self.files.get(self.key(target))
+        if entry and tuple(entry['signature']) == file_signature(target):
+            return entry['sha256']
+        with open(target, 'r', encoding='utf-8') as f:
+            return content_hash(f.read())
+
+    def write(self, target, text):
+        """Write ``text`` to ``target`` unless the file already holds the same content; returns True if written"""
+        digest = content_hash(text)
+        if self.current_hash(target) == digest:
+            self.skipped.append(target)
+            written = False
+        else:
+            write_atomic(target, text)
+            self.written.append(target)
+            written = True
+        self.files[self.key(target)] = {'sha256': digest, 'signature': list(file_signature(target))}
+        return written
+
+    def save(self):
+        """Persist the manifest, dropping entries for pages that no longer exist"""
+        files = {key: entry for key, entry in self.files.items() if os.path.exists(os.path.join(OUTPUT_DIR, key))}
+        return write_atomic(self.manifest_path, json.dumps({'version': MANIFEST_VERSION, 'files': files},
+                                                           indent=1, sort_keys=True), optional=True)
+
+    def report(self):
+        print(f"{len(self.written)} file(s) written, {len(self.skipped)} unchanged file(s) skipped")
+        for target in self.skipped:
+            print(f"  unchanged: {os.path.basename(target)}")
@@ -0,0 +1,167 @@
+"""HTML rendering of solved timetables.
+
+``template.html`` and ``index_template.html`` are read once and split around
+their content placeholder. Every page is built as a list of fragments that is
+joined once, and the parts shared by many sections (the period header row
+and break cells) are rendered once and reused.
+"""
+import os
+from functools import lru_cache
+
+TEMPLATE_DIR = os.path.dirname(os.path.abspath(__file__))
+CONTENT_PLACEHOLDER = '<!-- CONTENT_PLACEHOLDER -->'
+
+
+@lru_cache(maxsize=None)
+def compile_template(name):
+    """``(head, tail)`` of a template around its content placeholder, read once per process"""
+    with open(os.path.join(TEMPLATE_DIR, name), 'r', encoding='utf-8') as f:
+        head, _, tail = f.read().partition(CONTENT_PLACEHOLDER)
+    return head, tail
+
+
+@lru_cache(maxsize=None)
+def header_row(periods):
+    """Header row for a tuple of ``(begin, end)`` period labels"""
+    parts = ['<tr><th>Day</th>']
+    for begin, end in periods:
+        parts.append(f'<th>{begin}<br>to<br>{end}</th>')
+    parts.append('</tr>\n')
+    return ''.join(parts)
+
+
+@lru_cache(maxsize=None)
+def break_cell(colspan):
+    return f'<td colspan="{colspan}" class="break">BREAK</td>'
+
+
+def session_cell(cell):
+    session = cell['session']
+    return f'''<td colspan="{cell['colspan']}" class="timetable-cell">
+                        <div class="course-block" style="background-color: #{cell['color']}">
+                            <strong>{session['code']} {session['type']}</strong><br>
+                            Room: {session['venue']}<br>
+                            {session['faculty']}
+                        </div>
+                    </td>'''
+
+
+def render_section(section_model, generated):
+    """Full HTML page for one section model (see main.build_section_model)"""
+    head, tail = compile_template('template.html')
+    parts = [head]
+    parts.append(f'''
+            <div class="timetable-header">
+                <h2>{section_model['title']}</h2>
+                <p class="timestamp">Generated: {generated}</p>
+            </div>
+            <table>
+        ''')
+    parts.append(header_row(tuple(section_model['periods'])))
+
+    for day in section_model['days']:
+        parts.append(f'<tr><td><b>{day["name"]}</b></td>')
+        for cell in day['cells']:
+            if cell['kind'] == 'break':
+                parts.append(break_cell(cell['colspan']))
+            elif cell['kind'] == 'session':
+                parts.append(session_cell(cell))
+            else:
+                parts.append('<td></td>')
+        parts.append('</tr>\n')
+    parts.append('</table>\n')
+
+    # LTPSC Legend first
+    parts.append('<div class="legend"><h3>LTPSC Information</h3>\n<table>\n')
+    parts.append('<tr><th>Course Code</th><th>L</th><th>T</th><th>P</th><th>S</th><th>C</th></tr>\n')
+    for course in section_model['courses']:
+        if course['hours'] is None:
+            continue
+        l_hours, t_hours, p_hours, s_hours, credits = course['hours']
+        parts.append(f'''
+            <tr>
+                <td><strong>{course['code']}</strong></td>
+                <td>{l_hours}</td>
+                <td>{t_hours}</td>
+                <td>{p_hours}</td>
+                <td>{s_hours}</td>
+                <td>{credits}</td>
+            </tr>''')
+    parts.append('</table></div>\n')
+
+    # Course Legend after LTPSC
+    parts.append('<div class="legend"><h3>Course Legend</h3>\n<table>\n')
+    parts.append('<tr><th>Course Code</th><th>Color</th><th>Course Name</th><th>Faculty</th></tr>\n')
+    for course in section_model['courses']:
+        parts.append(f'''
+            <tr>
+                <td><strong>{course['code']}</strong></td>
+                <td><div class="legend-color" style="background-color: #{course['color']}"></div></td>
+                <td>{course['name']}</td>
+                <td>{course['faculty']}</td>
+            </tr>''')
+    parts.append('</table></div>\n')
+
+    parts.append(tail)
+    return ''.join(parts)
+
+
+def render_index(timetable_index):
+    """Index page linking every section page; ``timetable_index`` maps dept -> [(sem, section, filename)]"""
+    head, tail = compile_template('index_template.html')
+    parts = [head]
+    for dept, semesters in sorted(timetable_index.items()):
+        parts.append(f'''
+        <div class="dept-section">
+            <h2 class="dept-title">{dept} Department</h2>
+            <div class="semester-grid">
+        ''')
+
+        if dept == 'CSE':
+            # Group CSE by semester
+            sem_groups = {}
+            for term, section, filename in sorted(semesters):
+                sem_groups.setdefault(term, []).append((section, filename))
+
+            for term in sorted(sem_groups.keys()):
+                parts.append(f'<div class="semester-group"><h3>Semester {term}</h3>')
+                for section, filename in sorted(sem_groups[term]):
+                    parts.append(f'''
+                        <a href="{filename}" class="semester-link">
+                            Section {section}
+                        </a>
+                    ''')
+                parts.append('</div>')
+        else:
+            # Unchanged display for other departments
+            for term, _, filename in sorted(semesters):
+                parts.append(f'''
+                    <a href="{filename}" class="semester-link">
+                        Semester {term}
+                    </a>
+                ''')
+
+        parts.append('</div></div>')
+
+    parts.append(tail)
+    return ''.join(parts)
+
+
+def render_link_index(heading, links):
+    """Index page with one block of ``(name, filename)`` links, e.g. every faculty timetable"""
+    head, tail = compile_template('index_template.html')
+    parts = [head]
+    parts.append(f'''
+        <div class="dept-section">
+            <h2 class="dept-title">{heading}</h2>
+            <div class="semester-grid">
+        ''')
+    for name, filename in links:
+        parts.append(f'''
+                    <a href="{filename}" class="semester-link">
+                        {name}
+                    </a>
+                ''')
+    parts.append('</div></div>')
+    parts.append(tail)
+    return ''.join(parts)
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The scheduler modules live at the top of the repository, next to main.py
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
@@ -0,0 +1,47 @@
+import random
+
+import main
+from csp_engine import solve_sessions
+from occupancy import block_mask
+
+
+def solve_lecture(course_elsewhere, seed):
+    variables = [{'kind': 'LEC', 'code': 'CS101', 'blocks': 3, 'resources': [('section',)]}]
+    return solve_sessions(variables, {('section',): [0]}, 1, 8, 0, 0, random.Random(seed),
+                          course_elsewhere=course_elsewhere)
+
+
+def test_starts_clashing_with_other_sections_are_excluded():
+    # Another section holds CS101 in periods 0-2; only starts 3-5 keep clear of it
+    elsewhere = {'CS101': [block_mask(0, 3)]}
+    for seed in range(20):
+        placements, conflicts = solve_lecture(elsewhere, seed)
+        assert not conflicts
+        assert placements[0][1] in {3, 4, 5}
+
+
+def test_course_held_elsewhere_in_every_free_block_is_reported():
+    elsewhere = {'CS101': [block_mask(0, 8)]}
+    placements, conflicts = solve_lecture(elsewhere, 0)
+    assert placements == [None]
+    assert conflicts == [(0, "CS101 is held by another section in every free block")]
+
+
+def test_schedule_sessions_csp_avoids_course_periods_of_other_sections():
+    main.initialize_time_periods()
+    for seed in range(10):
+        for shared in main.SHARED_SCHEDULES.values():
+            shared.clear()
+        # Section A holds CS101 in every period up to 16:30, leaving only the last two hours of each day
+        section_a = main.new_section_schedule()
+        for day_idx in range(len(main.WEEKDAYS)):
+            for start_period in range(0, 15, main.LECTURE_BLOCKS):
+                session = main.new_session('LEC', 'CS101', 'Course', 'Dr. A', 'R1', main.LECTURE_BLOCKS)
+                main.book_session(section_a, session, day_idx, start_period)
+
+        section_b = main.new_section_schedule()
+        session = main.new_session('LEC', 'CS101', 'Course', 'Dr. B', 'R2', main.LECTURE_BLOCKS)
+        assert main.schedule_sessions_csp(section_b, [session], random.Random(seed)) == []
+        for day_idx in range(len(main.WEEKDAYS)):
+            assert not (section_a['grid'].course_periods['CS101'][day_idx] &
+                        section_b['grid'].course_periods['CS101'][day_idx])
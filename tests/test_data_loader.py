@@ -0,0 +1,23 @@
+from data_loader import clean_faculty_name, room_names
+
+
+def test_alternative_rooms_are_split():
+    assert room_names('L106/L107') == ('L106', 'L107')
+    assert room_names('C202/C203/C204/C202') == ('C202', 'C203', 'C204')
+
+
+def test_annotations_are_stripped():
+    assert room_names('C205/C004(Friday)') == ('C205', 'C004')
+
+
+def test_placeholders_name_no_room():
+    assert room_names('Will be scheduled Post MidSem/Will be scheduled Post MidSem') == ()
+    assert room_names('-/-/C303/-/online') == ('C303',)
+    assert room_names(float('nan')) == ()
+
+
+def test_faculty_names_split_on_the_word_and_only():
+    assert clean_faculty_name('Dr. Pramod Yelmewad and Dr. Animesh Roy') == 'Dr. Pramod Yelmewad'
+    assert clean_faculty_name('Dr. Anand Barangi') == 'Dr. Anand Barangi'
+    assert clean_faculty_name('Dr. Sandesh P/Dr. Siddharth') == 'Dr. Sandesh P'
+    assert clean_faculty_name('Chinmayanand/Dr. Krishnendu') == 'Chinmayanand'
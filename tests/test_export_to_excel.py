@@ -0,0 +1,33 @@
+import os
+
+from openpyxl import load_workbook
+
+from conftest import REPO_DIR
+from export_to_excel import read_section_html, write_workbook
+
+FIXTURE_DIR = os.path.join(REPO_DIR, 'tests', 'fixtures')
+
+
+def test_page_with_ltpsc_and_legend():
+    model = read_section_html(os.path.join(FIXTURE_DIR, 'section_page.html'), 'CSE', '2', 'A')
+    assert [day['name'] for day in model['days']] == ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+    courses = {course['code']: course for course in model['courses']}
+    assert courses['CS164']['hours'] == (3, 0, 2, 0, 4)
+    session = model['days'][0]['cells'][0]['session']
+    assert (session['code'], session['type'], session['venue'], session['blocks']) == ('CS164', 'LEC', 'C202', 3)
+
+
+def test_legend_only_page_has_no_hours():
+    # Sections without LTPSC data are published with only the course legend
+    model = read_section_html(os.path.join(FIXTURE_DIR, 'legend_only_page.html'), 'CSE', '2', None)
+    courses = {course['code']: course for course in model['courses']}
+    assert courses['CS164']['name'] == 'Data Structures & Algorithms'
+    assert courses['CS164']['color'] == 'FFD6E0'
+    assert all(course['hours'] is None for course in model['courses'])
+
+
+def test_legend_only_page_is_exported(tmp_path):
+    model = read_section_html(os.path.join(FIXTURE_DIR, 'legend_only_page.html'), 'cse', '2', None)
+    path = write_workbook([model], str(tmp_path / 'timetables.xlsx'))
+    sheet = load_workbook(path)['cse_2']
+    assert 'CS164' in [cell.value for cell in sheet['A']]
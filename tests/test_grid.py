@@ -0,0 +1,26 @@
+from grid import ScheduleGrid
+from occupancy import block_mask
+
+
+def session(code, blocks):
+    return {'type': 'LEC', 'code': code, 'blocks': blocks}
+
+
+def test_course_periods_on():
+    grid = ScheduleGrid(5, 19)
+    grid.place(session('CS101', 3), 1, 4)
+    grid.place(session('CS102', 2), 1, 8)
+    assert grid.course_periods_on(1, 'CS101') == [4, 5, 6]
+    assert grid.course_periods_on(0, 'CS101') == []
+    assert grid.course_periods_on(1, 'MA101') == []
+
+
+def test_first_free_run():
+    grid = ScheduleGrid(5, 19)
+    grid.place(session('CS101', 3), 0, 2)
+    assert grid.first_free_run(0, 2) == 0
+    assert grid.first_free_run(0, 3) == 5
+    # A blocked period (e.g. a break) also ends a run
+    assert grid.first_free_run(0, 3, blocked_mask=block_mask(6, 1)) == 7
+    assert grid.first_free_run(1, 19) == 0
+    assert grid.first_free_run(0, 19) == -1
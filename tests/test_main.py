@@ -0,0 +1,30 @@
+import main
+
+
+def test_free_rooms():
+    main.initialize_time_periods()
+    main.room_schedule.clear()
+    for room in ('C101', 'C102', 'L105'):
+        main.room_schedule[room] = main.new_day_masks(len(main.WEEKDAYS))
+    main.mark_room_busy('C101/L105', 2, 4, 3)
+    assert main.free_rooms(2, 6, 2) == ['C102']
+    assert main.free_rooms(2, 7, 2) == ['C101', 'C102', 'L105']
+    assert main.free_rooms(1, 4, 3) == ['C101', 'C102', 'L105']
+    assert main.free_rooms(2, 0, 5, rooms=['C101', 'C102']) == ['C102']
+
+
+def test_random_engine_reports_course_held_by_another_section():
+    main.initialize_time_periods()
+    for shared in main.SHARED_SCHEDULES.values():
+        shared.clear()
+    # Section A holds CS101 in every period of the week
+    section_a = main.new_section_schedule()
+    for day_idx in range(len(main.WEEKDAYS)):
+        for start_period in range(len(main.TIME_PERIODS)):
+            session = main.new_session('TUT', 'CS101', 'Course', 'Dr. A', 'R1', 1)
+            main.book_session(section_a, session, day_idx, start_period)
+
+    section_b = main.new_section_schedule()
+    session = main.new_session('LEC', 'CS101', 'Course', 'Dr. B', 'R2', main.LECTURE_BLOCKS)
+    assert main.schedule_sessions_random(section_b, [session]) == [
+        (session, "CS101 is held by another section in every free block")]
@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+import main
+
+pytest.importorskip('numpy')
+
+CODES = ['C1', 'C2', 'C3']
+
+
+def random_schedule(rng, dept, sem, section):
+    """A section schedule with random bookings; some land in another section to fill the run-wide course index"""
+    schedule = main.new_section_schedule(dept, sem, section)
+    other_schedule = main.new_section_schedule(dept, sem, section)
+    for _ in range(rng.randint(0, 12)):
+        session = main.new_session(rng.choice(['LEC', 'TUT', 'LAB']), rng.choice(CODES), 'Course',
+                                   rng.choice(['Dr. A', 'Dr. B']), rng.choice(['R1', 'R2']),
+                                   rng.choice([main.LECTURE_BLOCKS, main.TUTORIAL_BLOCKS, main.LAB_BLOCKS]))
+        day_idx = rng.randrange(len(main.WEEKDAYS))
+        start_period = rng.randrange(len(main.TIME_PERIODS) - session['blocks'] + 1)
+        target = rng.choice([schedule, other_schedule])
+        if main.placement_fits(target, session, day_idx, start_period):
+            main.book_session(target, session, day_idx, start_period)
+    return schedule
+
+
+def test_vectorized_scoring_matches_find_best_slot():
+    main.initialize_time_periods()
+    rng = random.Random(0)
+    profiles = [(None, None, None)] + [(dept, sem_key, None) for dept, dept_breaks in main.DEPT_BREAK_SLOTS.items()
+                                       for sem_key in dept_breaks]
+    for _ in range(200):
+        for shared in main.SHARED_SCHEDULES.values():
+            shared.clear()
+        dept, sem, section = rng.choice(profiles)
+        schedule = random_schedule(rng, dept, sem, section)
+
+        faculty = main.faculty_id(rng.choice(['Dr. A', 'Dr. B']))
+        venue, code_id = rng.choice(['R1', 'R2']), rng.choice(CODES)
+        expected = [main.find_best_slot(schedule, faculty, venue, main.LECTURE_BLOCKS, day_idx, code_id, 'LEC')
+                    for day_idx in range(len(main.WEEKDAYS))]
+        actual = main.find_best_slots_vectorized(schedule, faculty, venue, main.LECTURE_BLOCKS, code_id, 'LEC')
+        assert actual == expected, f"{dept} {sem}"
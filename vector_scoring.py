@@ -0,0 +1,60 @@
+"""Batched lecture-slot scoring with NumPy.
+
+Scores every start period on every day in one pass: occupancy is expanded
+into a (days x periods) boolean matrix and block feasibility, same-course
+spacing and break proximity are window sums over cumulative sums. The best
+start per day is then a single argmax. ``main.find_best_slot`` stays the
+reference implementation; tests/test_vector_scoring.py checks that both pick
+the same slots on randomized schedules.
+"""
+import numpy as np
+
+
+def mask_matrix(day_masks, num_periods):
+    """Expand per-day period bitmasks into a (days x periods) boolean matrix"""
+    masks = np.asarray(day_masks, dtype=np.int64).reshape(-1, 1)
+    return (masks >> np.arange(num_periods, dtype=np.int64)) & 1 == 1
+
+
+def window_sums(matrix, width):
+    """Sum of each run of ``width`` consecutive columns, one column per start position"""
+    padded = np.zeros((matrix.shape[0], matrix.shape[1] + 1), dtype=np.int32)
+    np.cumsum(matrix, axis=1, out=padded[:, 1:])
+    return padded[:, width:] - padded[:, :-width]
+
+
+def best_lecture_starts(busy_masks, course_start_masks, near_break_mask, num_blocks, num_periods,
+                        min_gap=6, prefer_near_break=True):
+    """Best start period per day (-1 if none) for a block of ``num_blocks`` periods.
+
+    ``busy_masks`` holds the per-day periods already blocked by bookings and
+    breaks; ``course_start_masks`` the per-day starts of other sessions of the
+    same course (or None). Mirrors ``find_best_slot``: the first feasible start
+    whose block touches a near-break period wins, otherwise the first feasible
+    start.
+    """
+    num_days = len(busy_masks)
+    if num_blocks > num_periods:
+        return [-1] * num_days
+
+    busy = mask_matrix(busy_masks, num_periods)
+    blocked_starts = np.zeros((num_days, num_periods - num_blocks + 1), dtype=bool)
+    if course_start_masks is not None:
+        course_starts = mask_matrix(course_start_masks, num_periods)
+        # Same course may not share a period with itself on another day
+        busy |= course_starts.any(axis=0)
+        # Minimum gap: any other start of the course within min_gap periods on the same day
+        padded = np.pad(course_starts, ((0, 0), (min_gap, min_gap)))
+        nearby = window_sums(padded, 2 * min_gap + 1) > 0
+        blocked_starts = nearby[:, :num_periods - num_blocks + 1]
+
+    feasible = (window_sums(busy, num_blocks) == 0) & ~blocked_starts
+    score = feasible.astype(np.int8)
+    if prefer_near_break:
+        near = mask_matrix([near_break_mask], num_periods)
+        proximity = window_sums(near, num_blocks)[0] > 0
+        score += feasible & proximity
+
+    best = score.argmax(axis=1)
+    best[score.max(axis=1) == 0] = -1
+    return best.tolist()